@@ -0,0 +1,193 @@
+"""
+Benchmark suite for napagrad forward, backward and training throughput.
+
+Runs a grid of MLP sizes and batch sizes and measures, for each one:
+- graph_construction: building the per-sample loss graphs with Value
+- forward: gradient-free forward pass (MLP.predict)
+- backward: Value.backward on the built loss graph
+- zero_grad: resetting the gradients of the loss graph
+- train_step: build graph + backward + SGD step on the scalar engine
+- train_step_batched: the same training step on the batched Tensor path
+
+Each benchmark reports the best time over several repeats, nodes/sec and
+samples/sec. Each configuration also records the graph size and depth (the
+recursion depth a recursive traversal would need) and the peak memory of one
+build + backward (measured separately with tracemalloc).
+
+Results are written as JSON. With --baseline, times are compared to a stored
+result file and slowdowns beyond the tolerance are reported as regressions
+(exit code 1).
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import _graph_depth, _topological_order
+from neural_network import MLP
+from optim import SGD
+from profiler import best_time
+
+DEFAULT_SIZES = "4,16,1;16,32,32,1;64,64,64,1"
+DEFAULT_BATCH_SIZES = "1,32"
+
+
+def build_loss(model, inputs, targets):
+    """Build the summed squared-error loss graph of a batch with the scalar engine."""
+    loss = 0.0
+    for x, y in zip(inputs, targets):
+        loss = (model(x) - y).pow(2) + loss
+    return loss
+
+
+def benchmark_config(layer_sizes, batch_size, repeat=5, seed=0):
+    """Run every benchmark for one (layer_sizes, batch_size) configuration."""
+    random.seed(seed)
+    model = MLP(layer_sizes)
+    inputs = [[random.uniform(-1, 1) for _ in range(layer_sizes[0])] for _ in range(batch_size)]
+    targets = [random.uniform(-1, 1) for _ in range(batch_size)]
+    optimizer = SGD(model.parameters(), lr=1e-3)
+
+    loss = build_loss(model, inputs, targets)
+    topo = _topological_order(loss)
+    num_nodes = len(topo)
+    config = {
+        "layer_sizes": layer_sizes,
+        "batch_size": batch_size,
+        "num_parameters": len(model.parameters()),
+        "graph_nodes": num_nodes,
+        "graph_depth": _graph_depth(topo),
+    }
+
+    tracemalloc.start()
+    build_loss(model, inputs, targets).backward()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    config["peak_memory_bytes"] = peak
+
+    def train_step(_):
+        optimizer.zero_grad()
+        build_loss(model, inputs, targets).backward()
+        optimizer.step()
+
+    def train_step_batched(_):
+        optimizer.zero_grad()
+        (model(inputs) - targets).pow(2).sum().backward()
+        optimizer.step()
+
+    timings = {
+        "graph_construction": best_time(lambda _: build_loss(model, inputs, targets), repeat=repeat),
+        "forward": best_time(lambda _: [model.predict(x) for x in inputs], repeat=repeat),
+        "backward": best_time(lambda loss: loss.backward(),
+                              setup=lambda: build_loss(model, inputs, targets), repeat=repeat),
+        "zero_grad": best_time(lambda _: loss.zero_grad(), repeat=repeat),
+        "train_step": best_time(train_step, repeat=repeat),
+        "train_step_batched": best_time(train_step_batched, repeat=repeat),
+    }
+
+    results = []
+    for name, seconds in timings.items():
+        result = dict(config, benchmark=name, seconds=seconds,
+                      samples_per_sec=batch_size / seconds)
+        if name in ("graph_construction", "backward", "zero_grad", "train_step"):
+            result["nodes_per_sec"] = num_nodes / seconds
+        results.append(result)
+    return results
+
+
+def result_key(result):
+    return (tuple(result["layer_sizes"]), result["batch_size"], result["benchmark"])
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results to a baseline.
+
+    Returns:
+        List[dict]: One entry per benchmark that is slower than the baseline
+                    by more than tolerance (a fraction, e.g. 0.2 for 20%)
+    """
+    baseline_times = {result_key(r): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        if key not in baseline_times:
+            continue
+        ratio = result["seconds"] / baseline_times[key]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "layer_sizes": result["layer_sizes"],
+                "batch_size": result["batch_size"],
+                "benchmark": result["benchmark"],
+                "baseline_seconds": baseline_times[key],
+                "seconds": result["seconds"],
+                "slowdown": ratio,
+            })
+    return regressions
+
+
+def parse_sizes(text):
+    return [[int(n) for n in sizes.split(",")] for sizes in text.split(";")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="napagrad benchmark suite")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="MLP layer sizes, ';'-separated (default: %(default)s)")
+    parser.add_argument("--batch-sizes", default=DEFAULT_BATCH_SIZES,
+                        help="Comma-separated batch sizes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per benchmark (best is kept)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown vs. the baseline (default: %(default)s = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for layer_sizes in parse_sizes(args.sizes):
+        for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            for result in benchmark_config(layer_sizes, batch_size, repeat=args.repeat):
+                results.append(result)
+                print(f"{str(layer_sizes):<20} batch={batch_size:<5} {result['benchmark']:<20} "
+                      f"{result['seconds'] * 1e3:10.3f} ms  {result['samples_per_sec']:12.1f} samples/s")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['layer_sizes']} batch={r['batch_size']} {r['benchmark']}: "
+                  f"{r['baseline_seconds'] * 1e3:.3f} ms -> {r['seconds'] * 1e3:.3f} ms "
+                  f"({r['slowdown']:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
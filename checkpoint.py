@@ -0,0 +1,190 @@
+"""
+Compact binary checkpoints for MLP models.
+
+A checkpoint file consists of:
+1. The magic bytes b"NAPAGRAD"
+2. A little-endian uint32 with the length of the header
+3. A UTF-8 JSON header (layer_sizes, activations, dtype, parameter count),
+   padded with spaces so the data starts on an 8-byte boundary
+4. All parameters as one flat little-endian float buffer, in the order of
+   MLP.parameters(): for each layer, for each neuron, its weights then its bias
+
+Because the parameters form one flat buffer, a checkpoint can be memory-mapped
+and used for inference without parsing or copying (see FrozenMLP).
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"NAPAGRAD"
+FORMAT_VERSION = 1
+
+# Activation functions a checkpoint may reference, applied to NumPy arrays
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+}
+
+
+def write_checkpoint(path, layer_sizes, activations, values, dtype='<f8'):
+    """
+    Write a checkpoint file.
+
+    Args:
+        path: Destination file path
+        layer_sizes: List of layer sizes, e.g. [3, 4, 1]
+        activations: Activation name applied after each layer
+        values: Flat sequence of parameter values (MLP.parameters() order)
+        dtype: NumPy dtype string of the stored parameters (little-endian)
+    """
+    data = np.asarray(values, dtype=dtype)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "layer_sizes": list(layer_sizes),
+        "activations": list(activations),
+        "dtype": np.dtype(dtype).str,
+        "count": len(data),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad so that the parameter buffer starts on an 8-byte boundary
+    prefix_length = len(MAGIC) + 4 + len(header_bytes)
+    header_bytes += b" " * (-prefix_length % 8)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data.tobytes())
+
+
+def read_checkpoint(path, mmap=False):
+    """
+    Read a checkpoint file.
+
+    Args:
+        path: Checkpoint file path
+        mmap: Memory-map the parameter buffer instead of reading it into memory
+
+    Returns:
+        tuple: (header dict, flat parameter array)
+
+    Raises:
+        ValueError: If the file is not a napagrad checkpoint or has an
+                    unsupported format version
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a napagrad checkpoint")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+        offset = f.tell()
+
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format version: {header.get('format_version')}")
+
+    dtype = np.dtype(header["dtype"])
+    if mmap:
+        data = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(header["count"],))
+    else:
+        data = np.fromfile(path, dtype=dtype, count=header["count"], offset=offset)
+    return header, data
+
+
+def _layer_views(layer_sizes, data):
+    """
+    Split a flat parameter buffer into per-layer (weights, bias) views.
+
+    Each layer's block holds one row per neuron: its weights followed by its
+    bias. The returned weights have shape (num_inputs, num_outputs) and both
+    arrays are views into data, so nothing is copied.
+    """
+    layers = []
+    offset = 0
+    for num_inputs, num_outputs in zip(layer_sizes[:-1], layer_sizes[1:]):
+        size = num_outputs * (num_inputs + 1)
+        block = data[offset:offset + size].reshape(num_outputs, num_inputs + 1)
+        layers.append((block[:, :num_inputs].T, block[:, num_inputs]))
+        offset += size
+    if offset != len(data):
+        raise ValueError(f"Expected {offset} parameters for layer sizes {layer_sizes}, got {len(data)}")
+    return layers
+
+
+class FrozenMLP:
+    """
+    An inference-only MLP backed by flat parameter arrays.
+
+    Unlike MLP, a FrozenMLP holds no Value objects: each layer is a
+    (weights, bias) pair of NumPy views into one flat buffer, which may be a
+    memory-mapped checkpoint file.
+    """
+
+    def __init__(self, layer_sizes, activations, data):
+        """
+        Initialize a frozen MLP.
+
+        Args:
+            layer_sizes: List of layer sizes, e.g. [3, 4, 1]
+            activations: Activation name applied after each layer
+            data: Flat parameter array (MLP.parameters() order)
+        """
+        unknown = set(activations) - set(ACTIVATIONS)
+        if unknown:
+            raise ValueError(f"Unsupported activations: {sorted(unknown)}")
+        self.layer_sizes = list(layer_sizes)
+        self.activations = list(activations)
+        self.data = data
+        self.layers = _layer_views(self.layer_sizes, data)
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Freeze a trained MLP, copying its current parameter values.
+
+        Args:
+            model: The MLP to freeze
+
+        Returns:
+            FrozenMLP: A frozen copy of the model
+        """
+        return cls(model.layer_sizes, model.activations(), model._flat_values())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a checkpoint for inference.
+
+        Args:
+            path: Checkpoint file path (written by MLP.save)
+            mmap: Memory-map the parameters instead of reading them into memory
+
+        Returns:
+            FrozenMLP: The loaded model
+        """
+        header, data = read_checkpoint(path, mmap=mmap)
+        return cls(header["layer_sizes"], header["activations"], data)
+
+    def predict(self, inputs):
+        """
+        Forward pass on plain arrays.
+
+        Args:
+            inputs: One sample (list of numbers) or a 2-D batch of rows
+
+        Returns:
+            float, np.ndarray: Same shapes as MLP.predict
+        """
+        x = np.asarray(inputs, dtype=float)
+        single = x.ndim == 1
+        if single:
+            x = x[np.newaxis, :]
+        for (weights, bias), activation in zip(self.layers, self.activations):
+            x = ACTIVATIONS[activation](x @ weights + bias)
+        if x.shape[1] == 1:
+            x = x[:, 0]
+        if single:
+            return x[0].item() if x.ndim == 1 else x[0].tolist()
+        return x
@@ -0,0 +1,331 @@
+"""
+Graph compilation for the scalar Value engine.
+
+The computational graph an MLP builds has the same structure for every sample;
+only the leaf values change. This module traces one forward pass over Value,
+lowers the graph to a flat instruction tape (integer op codes plus index arrays
+into value/gradient buffers), and generates straight-line Python functions from
+the tape. Replaying them for new inputs creates no Value objects at all.
+"""
+
+import builtins
+import math
+from array import array
+
+from core import Value, _topological_order
+
+
+class CompiledModel:
+    """
+    A model and loss function lowered to a flat instruction tape.
+
+    Every node of the traced graph gets a slot in a value buffer and a gradient
+    buffer. Instruction i computes slot outputs[i] with operation opcodes[i]
+    from the slots arguments[offsets[i]:offsets[i + 1]].
+
+    The current parameter values are read from the model on every call, and
+    gradients are accumulated into the parameters' gradient attributes exactly
+    like Value.backward, so optimizers keep working on model.parameters().
+
+    The graph is traced once, so the loss function must not branch on values
+    (e.g. `if prediction.value > 0`); the branch taken while tracing is baked in.
+    """
+
+    def __init__(self, loss, inputs, targets, parameters):
+        """
+        Lower a traced graph to a tape and generate its replay functions.
+
+        Args:
+            loss: The traced loss Value (root of the graph)
+            inputs: Placeholder Values used for the model inputs while tracing
+            targets: Placeholder Values used for the targets while tracing
+            parameters: The model's parameters (List[Value])
+        """
+        topo = _topological_order(loss)
+        index = {node: i for i, node in enumerate(topo)}
+
+        self.num_slots = len(topo)
+        self.loss_slot = index[loss]
+        self.input_slots = [index[x] for x in inputs if x in index]
+        self.target_slots = [index[t] for t in targets if t in index]
+        self.num_inputs = len(inputs)
+        self.num_targets = len(targets)
+        self.parameters = [p for p in parameters if p in index]
+        self.parameter_slots = [index[p] for p in self.parameters]
+
+        # Buffer template: constants keep the value they had while tracing
+        self._initial_values = [node.value for node in topo]
+
+        # Positions of the placeholders within inputs/targets, for loading
+        self._input_positions = [i for i, x in enumerate(inputs) if x in index]
+        self._target_positions = [i for i, t in enumerate(targets) if t in index]
+
+        # Flat tape: op codes, output slots and CSR-style argument slots
+        self.opcodes = array('B')
+        self.outputs = array('l')
+        self.arguments = array('l')
+        self.offsets = array('l', [0])
+        for node in topo:
+            if node.operation:
+                if node.operation not in OPCODES:
+                    raise ValueError(f"Cannot compile operation '{node.operation}'")
+                self.opcodes.append(OPCODES[node.operation])
+                self.outputs.append(index[node])
+                self.arguments.extend(index[child] for child in node.children)
+                self.offsets.append(len(self.arguments))
+
+        # Only nodes that depend on a parameter need gradient work
+        requires_grad = [False] * self.num_slots
+        for slot in self.parameter_slots:
+            requires_grad[slot] = True
+        for i, out in enumerate(self.outputs):
+            args = self.arguments[self.offsets[i]:self.offsets[i + 1]]
+            requires_grad[out] = any(requires_grad[a] for a in args)
+        self._requires_grad = requires_grad
+
+        self._forward = _generate(self._forward_source(), '_forward')
+        self._backward = _generate(self._backward_source(), '_backward')
+        self.values = None  # Value buffer of the most recent forward pass
+
+    def __len__(self):
+        """Number of instructions on the tape."""
+        return len(self.opcodes)
+
+    def _instructions(self):
+        """Yield (operation, output slot, argument slots) for every instruction."""
+        for i, opcode in enumerate(self.opcodes):
+            args = tuple(self.arguments[self.offsets[i]:self.offsets[i + 1]])
+            yield OPERATIONS[opcode], self.outputs[i], args
+
+    def _forward_source(self):
+        lines = ["def _forward(v):"]
+        for operation, out, args in self._instructions():
+            lines.append("    " + _FORWARD_EMITTERS[operation](out, args))
+        lines.append("    return v")
+        return "\n".join(lines)
+
+    def _backward_source(self):
+        lines = ["def _backward(v, g):"]
+        requires_grad = self._requires_grad
+        for operation, out, args in reversed(list(self._instructions())):
+            if not requires_grad[out]:
+                continue
+            needed = [requires_grad[a] for a in args]
+            for line in _BACKWARD_EMITTERS[operation](out, args, needed):
+                lines.append("    " + line)
+        lines.append("    return g")
+        return "\n".join(lines)
+
+    def _load(self, inputs, target):
+        """Fill a fresh value buffer with parameters, inputs and targets."""
+        if len(inputs) != self.num_inputs:
+            raise ValueError(f"Expected {self.num_inputs} inputs, got {len(inputs)}")
+        if self.num_targets == 1 and not isinstance(target, (list, tuple)):
+            target = [target]
+        if len(target) != self.num_targets:
+            raise ValueError(f"Expected {self.num_targets} targets, got {len(target)}")
+
+        v = list(self._initial_values)
+        for slot, param in zip(self.parameter_slots, self.parameters):
+            v[slot] = param.value
+        for slot, position in zip(self.input_slots, self._input_positions):
+            x = inputs[position]
+            v[slot] = x.value if isinstance(x, Value) else x
+        for slot, position in zip(self.target_slots, self._target_positions):
+            t = target[position]
+            v[slot] = t.value if isinstance(t, Value) else t
+        return v
+
+    def forward(self, inputs, target):
+        """
+        Replay the forward pass for one sample.
+
+        Args:
+            inputs: List of input values (floats or Value objects)
+            target: Target value (or list of targets for several outputs)
+
+        Returns:
+            float: The loss
+        """
+        self.values = self._forward(self._load(inputs, target))
+        return self.values[self.loss_slot]
+
+    def backward(self):
+        """
+        Replay the backward pass of the most recent forward() call.
+
+        Gradients are accumulated into the model parameters' gradient attributes.
+        """
+        if self.values is None:
+            raise RuntimeError("backward() called before forward()")
+        g = [0.0] * self.num_slots
+        g[self.loss_slot] = 1.0
+        self._backward(self.values, g)
+        for slot, param in zip(self.parameter_slots, self.parameters):
+            param.gradient += g[slot]
+
+    def forward_backward(self, inputs, target):
+        """
+        Fused forward and backward pass for one sample.
+
+        Args:
+            inputs: List of input values (floats or Value objects)
+            target: Target value (or list of targets for several outputs)
+
+        Returns:
+            float: The loss
+        """
+        self.forward(inputs, target)
+        self.backward()
+        return self.values[self.loss_slot]
+
+
+def compile(model, loss_fn, num_targets=None):
+    """
+    Trace one forward pass of a model and compile it to a replayable tape.
+
+    Note that this shadows the builtin compile() when imported by name.
+
+    Args:
+        model: The model to compile (an MLP)
+        loss_fn: Function (prediction, target) -> loss Value, where prediction
+                 and target are Values (or lists of Values for several outputs)
+        num_targets: Number of target values (defaults to the number of outputs)
+
+    Returns:
+        CompiledModel: The compiled model and loss
+
+    Example:
+        step = compile(model, lambda pred, y: (pred - y).pow(2))
+        for x, y in data:
+            loss = step.forward_backward(x, y)
+    """
+    num_inputs = model.layer_sizes[0]
+    num_outputs = model.layer_sizes[-1]
+    num_targets = num_outputs if num_targets is None else num_targets
+
+    inputs = [Value(0.0, label=f"x{i}") for i in range(num_inputs)]
+    targets = [Value(0.0, label=f"y{i}") for i in range(num_targets)]
+    prediction = model(inputs)
+    loss = loss_fn(prediction, targets[0] if num_targets == 1 else targets)
+    return CompiledModel(loss, inputs, targets, model.parameters())
+
+
+def _generate(source, name):
+    """Compile generated source code and return the function it defines."""
+    namespace = {"_exp": math.exp, "_log": math.log, "_tanh": math.tanh}
+    exec(builtins.compile(source, f"<napagrad {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+# Op codes of the tape, in the order of OPERATIONS
+OPERATIONS = ("+", "-", "*", "/", "relu", "pow", "exp", "tanh", "linear", "log")
+OPCODES = {operation: code for code, operation in enumerate(OPERATIONS)}
+
+
+# Forward emitters: (out, args) -> one line of Python computing v[out]
+
+def _emit_forward_linear(o, a, chunk=32):
+    # Split long sums over several statements to keep expressions shallow.
+    # Each statement continues the running sum, so the terms are added left
+    # to right like core.linear and the result is bitwise identical
+    n = len(a) // 2
+    terms = [f"v[{a[1 + i]}] * v[{a[1 + n + i]}]" for i in range(n)]
+    lines = [f"v[{o}] = " + " + ".join([f"v[{a[0]}]", *terms[:chunk]])]
+    for start in range(chunk, n, chunk):
+        lines.append(f"v[{o}] = " + " + ".join([f"v[{o}]", *terms[start:start + chunk]]))
+    return "; ".join(lines)
+
+
+_FORWARD_EMITTERS = {
+    "+": lambda o, a: f"v[{o}] = v[{a[0]}] + v[{a[1]}]",
+    "-": lambda o, a: f"v[{o}] = v[{a[0]}] - v[{a[1]}]",
+    "*": lambda o, a: f"v[{o}] = v[{a[0]}] * v[{a[1]}]",
+    "/": lambda o, a: f"v[{o}] = v[{a[0]}] / v[{a[1]}]",
+    "relu": lambda o, a: f"v[{o}] = v[{a[0]}] if v[{a[0]}] > 0 else 0",
+    "pow": lambda o, a: f"v[{o}] = v[{a[0]}] ** v[{a[1]}]",
+    "exp": lambda o, a: f"v[{o}] = _exp(v[{a[0]}])",
+    "log": lambda o, a: f"v[{o}] = _log(v[{a[0]}])",
+    "tanh": lambda o, a: f"v[{o}] = _tanh(v[{a[0]}])",
+    "linear": _emit_forward_linear,
+}
+
+
+# Backward emitters: (out, args, needed) -> lines adding into g[args[i]]
+# for every argument i with needed[i] set (mirroring core._BACKWARD_RULES)
+
+def _emit_backward_add(o, a, needed):
+    return [f"g[{a[i]}] += g[{o}]" for i in range(2) if needed[i]]
+
+
+def _emit_backward_sub(o, a, needed):
+    lines = []
+    if needed[0]:
+        lines.append(f"g[{a[0]}] += g[{o}]")
+    if needed[1]:
+        lines.append(f"g[{a[1]}] -= g[{o}]")
+    return lines
+
+
+def _emit_backward_mul(o, a, needed):
+    lines = []
+    if needed[0]:
+        lines.append(f"g[{a[0]}] += v[{a[1]}] * g[{o}]")
+    if needed[1]:
+        lines.append(f"g[{a[1]}] += v[{a[0]}] * g[{o}]")
+    return lines
+
+
+def _emit_backward_div(o, a, needed):
+    lines = []
+    if needed[0]:
+        lines.append(f"g[{a[0]}] += g[{o}] / v[{a[1]}]")
+    if needed[1]:
+        lines.append(f"g[{a[1]}] -= v[{a[0]}] * g[{o}] / (v[{a[1]}] * v[{a[1]}])")
+    return lines
+
+
+def _emit_backward_relu(o, a, needed):
+    return [f"if v[{a[0]}] > 0: g[{a[0]}] += g[{o}]"] if needed[0] else []
+
+
+def _emit_backward_pow(o, a, needed):
+    # Like Value.backward, the exponent receives no gradient
+    return [f"g[{a[0]}] += v[{a[1]}] * v[{a[0]}] ** (v[{a[1]}] - 1) * g[{o}]"] if needed[0] else []
+
+
+def _emit_backward_exp(o, a, needed):
+    return [f"g[{a[0]}] += v[{o}] * g[{o}]"] if needed[0] else []
+
+
+def _emit_backward_log(o, a, needed):
+    return [f"g[{a[0]}] += g[{o}] / v[{a[0]}]"] if needed[0] else []
+
+
+def _emit_backward_tanh(o, a, needed):
+    return [f"g[{a[0]}] += (1 - v[{o}] * v[{o}]) * g[{o}]"] if needed[0] else []
+
+
+def _emit_backward_linear(o, a, needed):
+    n = len(a) // 2
+    lines = [f"g[{a[0]}] += g[{o}]"] if needed[0] else []
+    for i in range(1, n + 1):
+        if needed[i]:
+            lines.append(f"g[{a[i]}] += v[{a[i + n]}] * g[{o}]")
+        if needed[i + n]:
+            lines.append(f"g[{a[i + n]}] += v[{a[i]}] * g[{o}]")
+    return lines
+
+
+_BACKWARD_EMITTERS = {
+    "+": _emit_backward_add,
+    "-": _emit_backward_sub,
+    "*": _emit_backward_mul,
+    "/": _emit_backward_div,
+    "relu": _emit_backward_relu,
+    "pow": _emit_backward_pow,
+    "exp": _emit_backward_exp,
+    "log": _emit_backward_log,
+    "tanh": _emit_backward_tanh,
+    "linear": _emit_backward_linear,
+}
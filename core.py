@@ -6,6 +6,47 @@ and backpropagation through computational graphs.
 """
 
 import math
+import threading
+from contextlib import contextmanager
+
+
+class _GradMode(threading.local):
+    """Whether operations record the computational graph, per thread (see no_grad)."""
+    enabled = True
+
+
+_grad_mode = _GradMode()
+
+
+@contextmanager
+def no_grad():
+    """
+    Context manager that disables graph construction.
+    
+    Inside the block, operations on Value (and Tensor) still compute their
+    results but store no children or operation, so nothing is kept alive for
+    backpropagation. Use it for inference. The setting only applies to the
+    current thread, so other threads keep recording their graphs.
+    
+    Example:
+        with no_grad():
+            prediction = model(inputs)
+    """
+    previous = _grad_mode.enabled
+    _grad_mode.enabled = False
+    try:
+        yield
+    finally:
+        _grad_mode.enabled = previous
+
+
+# Alias matching the name used by other frameworks
+inference_mode = no_grad
+
+
+def is_grad_enabled():
+    """Return True if operations in this thread record the computational graph."""
+    return _grad_mode.enabled
 
 
 class Value:
@@ -15,9 +56,15 @@ class Value:
     This is the fundamental building block for automatic differentiation.
     Each Value object represents a scalar value and tracks how it was computed,
     enabling automatic computation of gradients through backpropagation.
+    
+    Nodes use __slots__ instead of an instance __dict__ to keep every node small,
+    and store their children as an ordered tuple so that repeated operands
+    (as in x * x or x - x) keep one entry per operand.
     """
 
-    def __init__(self, value, children=(), operation='', label=''):
+    __slots__ = ('value', 'gradient', 'children', 'operation', 'label', 'requires_grad', '_topo')
+
+    def __init__(self, value, children=(), operation='', label='', requires_grad=True):
         """
         Initialize a Value node.
         
@@ -26,19 +73,35 @@ class Value:
             children: Tuple of Value objects that this node depends on
             operation: String describing the operation that created this node
             label: Optional label for visualization
+            requires_grad: For leaves, whether backward() computes a gradient
+                           for this node (False for constants, see constant).
+                           A computed node requires a gradient if any of its
+                           children does.
         """
         self.value = value  # The actual numerical value
         self.gradient = 0.0  # Gradient for backpropagation
-        self.children = set(children)  # Previous nodes in the computation
-        self.operation = operation  # The operation that created this node
+        if _grad_mode.enabled:
+            self.children = tuple(children)  # Previous nodes in the computation (operand order)
+            self.operation = operation  # The operation that created this node
+            if self.children:
+                requires_grad = any(child.requires_grad for child in self.children)
+        else:
+            # Inside no_grad(): keep no references to the graph. Results of
+            # operations are not trainable leaves, so they need no gradient
+            self.children = ()
+            self.operation = ''
+            if children:
+                requires_grad = False
+        self.requires_grad = requires_grad
         self.label = label  # Optional label for visualization
+        self._topo = None  # Cached topological order (set by backward)
 
     def __repr__(self):
         return f"Value(value={self.value}, label={self.label})"
     
     def __add__(self, other):
         """Addition operation with automatic differentiation."""
-        other_value = other if isinstance(other, Value) else Value(other)
+        other_value = other if isinstance(other, Value) else constant(other)
         result = Value(
             value=self.value + other_value.value,
             children=(self, other_value),
@@ -48,7 +111,7 @@ class Value:
 
     def __mul__(self, other):
         """Multiplication operation with automatic differentiation."""
-        other_value = other if isinstance(other, Value) else Value(other)
+        other_value = other if isinstance(other, Value) else constant(other)
         result = Value(
             value=self.value * other_value.value,
             children=(self, other_value),
@@ -58,7 +121,7 @@ class Value:
 
     def __sub__(self, other):
         """Subtraction operation with automatic differentiation."""
-        other_value = other if isinstance(other, Value) else Value(other)
+        other_value = other if isinstance(other, Value) else constant(other)
         result = Value(
             value=self.value - other_value.value,
             children=(self, other_value),
@@ -69,9 +132,15 @@ class Value:
     def  __rmul__(self,other):
         return self * other
 
+    def __radd__(self, other):
+        return self + other
+
+    def __rsub__(self, other):
+        return constant(other) - self
+
     def __truediv__(self, other):
         """Division operation with automatic differentiation."""
-        other_value = other if isinstance(other, Value) else Value(other)
+        other_value = other if isinstance(other, Value) else constant(other)
         result = Value(
             value=self.value / other_value.value,
             children=(self, other_value),
@@ -79,7 +148,7 @@ class Value:
         )
         return result
      
-    def __neg__(self,other):
+    def __neg__(self):
         return self * -1
         
 
@@ -92,80 +161,109 @@ class Value:
         )
         return result
     
-    def backward(self):
+    def backward(self, create_graph=False, retain_graph=None):
         """
         Initialize gradient for backpropagation and compute gradients.
         
         This method performs automatic differentiation by:
-        1. Topologically sorting the computational graph
+        1. Topologically sorting the computational graph (iteratively, so deep
+           graphs do not hit the recursion limit)
         2. Initializing the output gradient to 1.0
-        3. Backpropagating gradients through all operations
-        """
-        # Topological sort to order nodes for backpropagation
-        topo = []
-        visited = set()
+        3. Backpropagating gradients through all operations via the
+           per-operation rules in _BACKWARD_RULES
+        
+        Nodes that do not require a gradient (constants and subtrees built
+        only from constants) are skipped, and receive no gradient.
         
-        def build_topo(v):
-            if v not in visited:
-                visited.add(v)
-                for child in v.children:
-                    build_topo(child)
-                topo.append(v)
+        Gradients accumulate: each call adds into the gradients of the leaves
+        (e.g. the model parameters), so calling backward() on the losses of
+        several micro-batches sums their gradients. Reset them with
+        MLP.zero_grad() (or an optimizer's zero_grad()) before accumulating.
+        Gradients of intermediate nodes are reset at the start of every call.
         
-        build_topo(self)
+        By default the graph is released while backpropagating: every node
+        drops the references to its children once its gradient has been
+        propagated, so each micro-batch graph can be freed as soon as its
+        backward() returns. Pass retain_graph=True to backpropagate through
+        the same graph again, or to draw it afterwards; the topological order
+        is then cached on the root node, so the next call skips the traversal.
+        The cache only serves repeated calls on that same root: a training
+        loop builds a new graph every step, which is traversed again. To
+        replay one graph shape for new data, use compiler.compile.
+        
+        Args:
+            create_graph: If True, gradients are computed with Value operations
+                          and stored as Value nodes, so they can be
+                          differentiated again (e.g. for Hessian-vector
+                          products, see hessian_vector_product)
+            retain_graph: Keep the graph after backward(); defaults to
+                          create_graph
+        
+        Raises:
+            RuntimeError: If the graph, or a part of it shared with another
+                          output, was released by an earlier backward()
+        """
+        if retain_graph is None:
+            retain_graph = create_graph
+        topo = self._topo
+        if topo is None:
+            topo = _topological_order(self)
+        self._topo = topo if retain_graph else None
+        
+        # Only leaves accumulate gradients across calls. A node with an
+        # operation but no children was released by an earlier backward()
+        # (only nodes that require a gradient are ever released)
+        for node in topo:
+            if node.children:
+                node.gradient = 0.0
+            elif node.operation and node.requires_grad:
+                raise RuntimeError(
+                    "The graph was released by a previous backward(); "
+                    "pass retain_graph=True to backpropagate through it again"
+                )
         
         # Initialize gradient of output node
-        self.gradient = 1.0
+        if create_graph:
+            self.gradient = Value(1.0)
+            rules = _GRAPH_BACKWARD_RULES
+        else:
+            self.gradient = 1.0
+            rules = _BACKWARD_RULES
         
         # Backpropagate through the graph
-        for node in reversed(topo):
-            if node.operation:
-                if node.operation == "+":
-                    # Gradient flows equally to both children
-                    for child in node.children:
-                        child.gradient += node.gradient
-                elif node.operation == "-":
-                    # Subtraction: d/dx(a-b) = da - db
-                    children = list(node.children)
-                    if len(children) == 2:
-                        a, b = children
-                        a.gradient += node.gradient
-                        b.gradient -= node.gradient
-                elif node.operation == "*":
-                    # Product rule: d/dx(ab) = b*da + a*db
-                    children = list(node.children)
-                    if len(children) == 2:
-                        a, b = children
-                        a.gradient += b.value * node.gradient
-                        b.gradient += a.value * node.gradient
-                elif node.operation == "relu":
-                    # ReLU derivative: 1 if x > 0, else 0
-                    child = list(node.children)[0]
-                    child.gradient += (1.0 if child.value > 0 else 0.0) * node.gradient
-                elif node.operation == "pow":
-                    # Power rule: d/dx(x^n) = n*x^(n-1)
-                    child, exponent = list(node.children)
-                    child.gradient += exponent.value * (child.value ** (exponent.value - 1)) * node.gradient
-                elif node.operation == "exp":
-                    # Exponential derivative: d/dx(e^x) = e^x
-                    child = list(node.children)[0]
-                    child.gradient += node.value * node.gradient
-                elif node.operation == "tanh":
-                    # Tanh derivative: d/dx(tanh(x)) = 1 - tanh²(x)
-                    child = list(node.children)[0]
-                    child.gradient += (1 - node.value**2) * node.gradient
+        if retain_graph:
+            for node in reversed(topo):
+                if node.operation and node.requires_grad:
+                    rules[node.operation](node)
+            return
+        
+        # Parents come before their children in reverse topological order, so
+        # a node's links can be dropped as soon as its rule has run. Subtrees
+        # built only from constants are kept: they need no gradient work, and
+        # other outputs that share them can still backpropagate
+        while topo:
+            node = topo.pop()
+            if node.requires_grad:
+                if node.operation:
+                    rules[node.operation](node)
+                node.children = ()
+            node._topo = None
 
     def zero_grad(self):
-        """Reset all gradients to zero."""
-        def reset_gradients(v):
-            v.gradient = 0.0
-            for child in v.children:
-                reset_gradients(child)
-        reset_gradients(self)
+        """
+        Reset all gradients in the graph to zero.
+        
+        Each node is visited exactly once, even when subexpressions are shared.
+        """
+        topo = self._topo
+        if topo is None:
+            topo = _topological_order(self)
+        for node in topo:
+            node.gradient = 0.0
 
     def pow(self, exponent):
         """Power operation: self^exponent."""
-        exponent_value = exponent if isinstance(exponent, Value) else Value(exponent)
+        exponent_value = exponent if isinstance(exponent, Value) else constant(exponent)
         result = Value(
             value=self.value ** exponent_value.value,
             children=(self, exponent_value),
@@ -182,6 +280,15 @@ class Value:
         )
         return result
 
+    def log(self):
+        """Natural logarithm: ln(self)."""
+        result = Value(
+            value=math.log(self.value),
+            children=(self,),
+            operation="log"
+        )
+        return result
+
     def tanh(self):
         """Hyperbolic tangent activation function."""
         result = Value(
@@ -190,3 +297,327 @@ class Value:
             operation="tanh"
         )
         return result
+
+
+def linear(weights, inputs, bias):
+    """
+    Fused weighted sum: bias + w1*x1 + w2*x2 + ... + wn*xn as a single node.
+    
+    Compared to a chain of binary + and * nodes this creates one node instead
+    of about 2n, and the depth of the graph no longer grows with n. The result
+    is bitwise identical to the chain, since the terms are added in the same
+    order.
+    
+    Args:
+        weights: List of n Value objects
+        inputs: List of n Value objects
+        bias: Value added to the weighted sum
+        
+    Returns:
+        Value: The weighted sum plus bias
+    """
+    result = Value(
+        value=sum([w.value * x.value for w, x in zip(weights, inputs)], bias.value),
+        children=(bias, *weights, *inputs),
+        operation="linear"
+    )
+    return result
+
+
+def constant(value):
+    """
+    Return a constant leaf: a Value that never receives a gradient.
+    
+    Raw numbers used as operands (x * 2, x - 1, -x, x.pow(2)) are wrapped with
+    this function. Constants are interned: wrapping the same number again
+    returns the same node (until _MAX_CONSTANTS distinct numbers have been
+    seen), so repeated constants do not allocate a new leaf each time.
+    
+    Args:
+        value: The number
+        
+    Returns:
+        Value: A leaf with requires_grad=False
+    """
+    # Key on the type and repr, so that 1 and 1.0, or 0.0 and -0.0, stay distinct
+    key = (type(value), repr(value))
+    node = _constants.get(key)
+    if node is None:
+        node = Value(value, requires_grad=False)
+        if len(_constants) < _MAX_CONSTANTS:
+            _constants[key] = node
+    return node
+
+
+# Interned constant leaves (see constant)
+_MAX_CONSTANTS = 4096
+_constants = {}
+
+
+def hessian_vector_product(output, parameters, vector):
+    """
+    Compute the Hessian of output times a vector, without forming the Hessian.
+    
+    Runs one backward pass with create_graph=True to get the gradient g as a
+    differentiable graph, then one ordinary backward pass through g·vector,
+    whose gradient with respect to the parameters is H·vector.
+    
+    Afterwards each parameter's gradient holds its first-order gradient (a
+    float), as after a normal backward().
+    
+    Args:
+        output: Scalar Value to differentiate (e.g. the loss)
+        parameters: List of Value objects to differentiate with respect to
+        vector: List of floats, one per parameter
+        
+    Returns:
+        tuple: (List[float] gradient, List[float] Hessian-vector product)
+    """
+    output.zero_grad()
+    output.backward(create_graph=True)
+    gradients = [p.gradient if isinstance(p.gradient, Value) else Value(p.gradient) for p in parameters]
+    
+    # g·v as a single fused node (bias 0, weights g, inputs v)
+    directional = linear(gradients, [constant(v) for v in vector], constant(0.0))
+    directional.zero_grad()
+    # A parameter that enters output linearly is not in the graph of g·v, so
+    # zero_grad() above misses it and it would keep its first-order gradient
+    for param in parameters:
+        param.gradient = 0.0
+    directional.backward(retain_graph=True)
+    
+    product = [float(p.gradient) for p in parameters]
+    for param, gradient in zip(parameters, gradients):
+        param.gradient = gradient.value
+    return [g.value for g in gradients], product
+
+
+def _topological_order(root):
+    """
+    Return all nodes reachable from root in topological order (children first).
+    
+    Uses an explicit stack instead of recursion, so the depth of the graph is
+    not limited by Python's recursion limit.
+    
+    Args:
+        root: The Value node to start from
+        
+    Returns:
+        List[Value]: Nodes ordered so that every node comes after its children
+    """
+    topo = []
+    visited = {root}
+    stack = [(root, iter(root.children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            if child not in visited:
+                visited.add(child)
+                stack.append((child, iter(child.children)))
+                break
+        else:
+            stack.pop()
+            topo.append(node)
+    return topo
+
+
+def _graph_depth(topo):
+    """
+    Return the longest path from a leaf to the root, in nodes.
+    
+    This is the recursion depth a recursive traversal of the graph would need.
+    
+    Args:
+        topo: Topological order of the graph (see _topological_order)
+        
+    Returns:
+        int: Depth of the graph (0 for an empty order)
+    """
+    depth = {}
+    for node in topo:
+        depth[node] = 1 + max((depth[child] for child in node.children), default=0)
+    return depth[topo[-1]] if topo else 0
+
+
+# Backward rules: each one propagates node.gradient into node's children.
+
+def _backward_add(node):
+    # Gradient flows equally to both children
+    for child in node.children:
+        if child.requires_grad:
+            child.gradient += node.gradient
+
+
+def _backward_sub(node):
+    # Subtraction: d/dx(a-b) = da - db
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient += node.gradient
+    if b.requires_grad:
+        b.gradient -= node.gradient
+
+
+def _backward_mul(node):
+    # Product rule: d/dx(ab) = b*da + a*db
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient += b.value * node.gradient
+    if b.requires_grad:
+        b.gradient += a.value * node.gradient
+
+
+def _backward_div(node):
+    # Quotient rule: d/dx(a/b) = da/b - a*db/b^2
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient += node.gradient / b.value
+    if b.requires_grad:
+        b.gradient -= a.value * node.gradient / (b.value * b.value)
+
+
+def _backward_relu(node):
+    # ReLU derivative: 1 if x > 0, else 0
+    for child in node.children:
+        if child.value > 0:
+            child.gradient += node.gradient
+
+
+def _backward_pow(node):
+    # Power rule: d/dx(x^n) = n*x^(n-1)
+    child, exponent = node.children
+    if child.requires_grad:
+        child.gradient += exponent.value * (child.value ** (exponent.value - 1)) * node.gradient
+
+
+def _backward_exp(node):
+    # Exponential derivative: d/dx(e^x) = e^x
+    for child in node.children:
+        child.gradient += node.value * node.gradient
+
+
+def _backward_log(node):
+    # Logarithm derivative: d/dx(ln x) = 1/x
+    for child in node.children:
+        child.gradient += node.gradient / child.value
+
+
+def _backward_tanh(node):
+    # Tanh derivative: d/dx(tanh(x)) = 1 - tanh²(x)
+    for child in node.children:
+        child.gradient += (1 - node.value**2) * node.gradient
+
+
+def _backward_linear(node):
+    # Children are (bias, w1..wn, x1..xn): d/dwi = xi, d/dxi = wi, d/dbias = 1
+    children = node.children
+    gradient = node.gradient
+    n = len(children) // 2
+    if children[0].requires_grad:
+        children[0].gradient += gradient
+    for weight, input_val in zip(children[1:n + 1], children[n + 1:]):
+        if weight.requires_grad:
+            weight.gradient += input_val.value * gradient
+        if input_val.requires_grad:
+            input_val.gradient += weight.value * gradient
+
+
+_BACKWARD_RULES = {
+    "+": _backward_add,
+    "-": _backward_sub,
+    "*": _backward_mul,
+    "/": _backward_div,
+    "relu": _backward_relu,
+    "pow": _backward_pow,
+    "exp": _backward_exp,
+    "log": _backward_log,
+    "tanh": _backward_tanh,
+    "linear": _backward_linear,
+}
+
+
+# Differentiable backward rules (backward(create_graph=True)): the same
+# derivatives as above, built from Value operations.
+
+def _add_gradient(node, contribution):
+    """Add a Value contribution to node.gradient without a needless 0.0 node."""
+    if not node.requires_grad:
+        return
+    gradient = node.gradient
+    if not isinstance(gradient, Value) and gradient == 0:
+        node.gradient = contribution
+    else:
+        node.gradient = contribution + gradient
+
+
+def _graph_backward_add(node):
+    for child in node.children:
+        _add_gradient(child, node.gradient)
+
+
+def _graph_backward_sub(node):
+    a, b = node.children
+    _add_gradient(a, node.gradient)
+    _add_gradient(b, -node.gradient)
+
+
+def _graph_backward_mul(node):
+    a, b = node.children
+    _add_gradient(a, b * node.gradient)
+    _add_gradient(b, a * node.gradient)
+
+
+def _graph_backward_div(node):
+    a, b = node.children
+    _add_gradient(a, node.gradient / b)
+    _add_gradient(b, -(a * node.gradient) / (b * b))
+
+
+def _graph_backward_relu(node):
+    for child in node.children:
+        if child.value > 0:
+            _add_gradient(child, node.gradient)
+
+
+def _graph_backward_pow(node):
+    # The exponent is treated as a constant, as in _backward_pow
+    child, exponent = node.children
+    _add_gradient(child, node.gradient * exponent.value * child.pow(exponent.value - 1))
+
+
+def _graph_backward_exp(node):
+    for child in node.children:
+        _add_gradient(child, node.gradient * node)
+
+
+def _graph_backward_log(node):
+    for child in node.children:
+        _add_gradient(child, node.gradient / child)
+
+
+def _graph_backward_tanh(node):
+    for child in node.children:
+        _add_gradient(child, node.gradient * (1 - node * node))
+
+
+def _graph_backward_linear(node):
+    children = node.children
+    gradient = node.gradient
+    n = len(children) // 2
+    _add_gradient(children[0], gradient)
+    for weight, input_val in zip(children[1:n + 1], children[n + 1:]):
+        _add_gradient(weight, input_val * gradient)
+        _add_gradient(input_val, weight * gradient)
+
+
+_GRAPH_BACKWARD_RULES = {
+    "+": _graph_backward_add,
+    "-": _graph_backward_sub,
+    "*": _graph_backward_mul,
+    "/": _graph_backward_div,
+    "relu": _graph_backward_relu,
+    "pow": _graph_backward_pow,
+    "exp": _graph_backward_exp,
+    "log": _graph_backward_log,
+    "tanh": _graph_backward_tanh,
+    "linear": _graph_backward_linear,
+}
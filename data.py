@@ -0,0 +1,242 @@
+"""
+Streaming data pipeline for training on files larger than memory.
+
+Records are (inputs, target) pairs produced lazily by generators, so only a
+bounded number of them is in memory at any time:
+
+    read -> shuffle_buffer -> batches -> prefetch -> training loop
+
+DataLoader wires these stages together and re-reads the source every epoch.
+"""
+
+import csv
+import queue
+import random
+import threading
+
+import numpy as np
+
+
+def iter_csv(path, target_column=-1, header=True, delimiter=","):
+    """
+    Stream (inputs, target) records from a CSV file of numbers.
+
+    Args:
+        path: CSV file path
+        target_column: Index of the target column (None for inputs only,
+                       in which case the target is None)
+        header: Whether the first row is a header to skip
+        delimiter: Field delimiter
+
+    Yields:
+        tuple: (List[float] inputs, float target)
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        if header:
+            next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            values = [float(field) for field in row]
+            if target_column is None:
+                yield values, None
+            else:
+                target = values.pop(target_column)
+                yield values, target
+
+
+def iter_npy(inputs_path, targets_path=None, target_column=-1):
+    """
+    Stream (inputs, target) records from .npy files without loading them.
+
+    The files are memory-mapped, so only the rows being read are paged in.
+
+    Args:
+        inputs_path: .npy file with a 2-D array of rows
+        targets_path: Optional .npy file with one target per row. If omitted,
+                      the target is taken from target_column of the inputs
+                      (None for inputs only, in which case the target is None).
+        target_column: Index of the target column when targets_path is omitted
+
+    Yields:
+        tuple: (np.ndarray inputs, float target)
+    """
+    inputs = np.load(inputs_path, mmap_mode="r")
+    targets = np.load(targets_path, mmap_mode="r") if targets_path is not None else None
+    for i in range(len(inputs)):
+        row = np.array(inputs[i], dtype=float)
+        if targets is not None:
+            yield row, targets[i].item() if targets.ndim == 1 else np.array(targets[i], dtype=float)
+        elif target_column is None:
+            yield row, None
+        else:
+            yield np.delete(row, target_column), row[target_column].item()
+
+
+def shuffle_buffer(records, buffer_size, seed=None):
+    """
+    Approximately shuffle a stream while holding at most buffer_size records.
+
+    The buffer is filled first; afterwards every incoming record replaces a
+    randomly chosen buffered record, which is yielded. A larger buffer gives a
+    more thorough shuffle.
+
+    Args:
+        records: Iterable of records
+        buffer_size: Maximum number of records held in memory
+        seed: Optional random seed
+
+    Yields:
+        Records in shuffled order
+    """
+    rng = random.Random(seed)
+    buffer = []
+    for record in records:
+        if len(buffer) < buffer_size:
+            buffer.append(record)
+            continue
+        i = rng.randrange(buffer_size)
+        yield buffer[i]
+        buffer[i] = record
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def batches(records, batch_size, drop_last=False):
+    """
+    Group a stream of (inputs, target) records into minibatch arrays.
+
+    Args:
+        records: Iterable of (inputs, target) records
+        batch_size: Number of records per batch
+        drop_last: Drop the final batch if it is smaller than batch_size
+
+    Yields:
+        tuple: (np.ndarray of shape (batch, features), np.ndarray of targets
+               or None if the records have no targets)
+    """
+    inputs, targets = [], []
+    for x, y in records:
+        inputs.append(x)
+        targets.append(y)
+        if len(inputs) == batch_size:
+            yield _stack(inputs, targets)
+            inputs, targets = [], []
+    if inputs and not drop_last:
+        yield _stack(inputs, targets)
+
+
+def _stack(inputs, targets):
+    """Stack buffered records into arrays (targets stay None for inputs-only data)."""
+    stacked_targets = None if targets[0] is None else np.asarray(targets, dtype=float)
+    return np.asarray(inputs, dtype=float), stacked_targets
+
+
+_END = object()  # Marks the end of a prefetched stream
+
+
+def prefetch(iterable, depth=2):
+    """
+    Produce items on a background thread, up to depth items ahead.
+
+    Reading and parsing the next batch then overlaps with training on the
+    current one. Exceptions raised by the producer are re-raised in the
+    consumer.
+
+    Args:
+        iterable: The iterable to consume in the background
+        depth: Maximum number of items buffered ahead of the consumer
+
+    Yields:
+        The items of iterable, in order
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                items.put(item)
+            items.put(_END)
+        except BaseException as error:  # re-raised in the consumer
+            items.put(error)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Let the producer exit if the consumer stops early
+        stop.set()
+        while thread.is_alive():
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.01)
+
+
+class DataLoader:
+    """
+    Iterate over minibatches of a streamed dataset, one epoch per iteration.
+
+    Example:
+        loader = DataLoader.from_csv('houses.csv', batch_size=32, shuffle=1024)
+        for epoch in range(10):
+            for inputs, targets in loader:
+                loss = (model(inputs) - targets).pow(2).mean()
+                ...
+    """
+
+    def __init__(self, source, batch_size, shuffle=0, prefetch_depth=2, drop_last=False, seed=None):
+        """
+        Initialize a data loader.
+
+        Args:
+            source: Zero-argument callable returning a fresh iterator of
+                    (inputs, target) records, e.g. lambda: iter_csv(path)
+            batch_size: Number of records per batch
+            shuffle: Size of the shuffle buffer (0 disables shuffling)
+            prefetch_depth: Number of batches prepared ahead on a background
+                            thread (0 disables prefetching)
+            drop_last: Drop the final batch if it is smaller than batch_size
+            seed: Optional random seed; epoch i shuffles with seed + i
+        """
+        self.source = source
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.prefetch_depth = prefetch_depth
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    @classmethod
+    def from_csv(cls, path, batch_size, target_column=-1, header=True, **kwargs):
+        """Create a DataLoader streaming from a CSV file (see iter_csv)."""
+        return cls(lambda: iter_csv(path, target_column=target_column, header=header),
+                   batch_size, **kwargs)
+
+    @classmethod
+    def from_npy(cls, inputs_path, batch_size, targets_path=None, target_column=-1, **kwargs):
+        """Create a DataLoader streaming from .npy files (see iter_npy)."""
+        return cls(lambda: iter_npy(inputs_path, targets_path, target_column=target_column),
+                   batch_size, **kwargs)
+
+    def __iter__(self):
+        records = self.source()
+        if self.shuffle:
+            seed = None if self.seed is None else self.seed + self.epoch
+            records = shuffle_buffer(records, self.shuffle, seed=seed)
+        self.epoch += 1
+        stream = batches(records, self.batch_size, drop_last=self.drop_last)
+        if self.prefetch_depth:
+            stream = prefetch(stream, depth=self.prefetch_depth)
+        return iter(stream)
@@ -5,6 +5,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from core import Value
 from neural_network import MLP
 from visualization import draw_computational_graph
+from optim import SGD
 
 print("🧠 Neural Network Example with Visualization")
 print("=" * 50)
@@ -48,8 +49,8 @@ print(f"First weight gradient: {model.layers[0].neurons[0].weights[0].gradient}"
 
 # Backward pass (backpropagation)
 print("\n⬅️  Backward pass (backpropagation)...")
-loss.zero_grad()  # Reset all gradients to 0
-loss.backward()   # Compute gradients
+loss.zero_grad()                 # Reset all gradients to 0
+loss.backward(retain_graph=True) # Compute gradients (keep the graph to draw it below)
 
 # Show gradients after backpropagation
 print(f"\nGradients after backpropagation:")
@@ -91,24 +92,25 @@ print(f"Loss improvement: {loss.value - new_loss.value:.4f}")
 
 # Multiple training steps
 print("\n🏋️  Multiple training steps...")
+optimizer = SGD(model.parameters(), lr=learning_rate)
 for step in range(5):
     # Forward pass
     pred = model(inputs)
     loss_val = (pred - target_price).pow(2)
     
     # Backward pass
-    loss_val.zero_grad()
+    optimizer.zero_grad()
     loss_val.backward()
     
     # Update
-    for param in model.parameters():
-        param.value -= learning_rate * param.gradient
+    optimizer.step()
     
     print(f"Step {step + 1}: Loss = {loss_val.value:.4f}, Prediction = ${pred.value:.2f}")
 
 # Final visualization
 print("\n📊 Final computational graph...")
-final_dot = draw_computational_graph(loss_val)
+final_loss = (model(inputs) - target_price).pow(2)
+final_dot = draw_computational_graph(final_loss)
 final_dot.render('neural_network_final', format='svg', cleanup=True)
 print("Final graph saved as 'neural_network_final.svg'")
 
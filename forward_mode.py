@@ -0,0 +1,206 @@
+"""
+Forward-mode automatic differentiation over Value graphs.
+
+Reverse mode (Value.backward) needs one backward pass per output. Forward mode
+pushes tangents from the inputs towards the outputs instead: every node carries
+a tangent alongside its value, like a dual number (value + tangent·ε). Tangents
+are NumPy vectors, so all input directions are propagated in one sweep and a
+full Jacobian costs one forward pass however many outputs there are.
+
+The function is traced once on Value inputs (so models built from Value, such
+as MLP, work unchanged), then tangents are propagated through the recorded
+graph in topological order using the per-operation rules in _TANGENT_RULES.
+"""
+
+import numpy as np
+
+from core import Value, _topological_order
+
+
+def jvp(f, inputs, tangents):
+    """
+    Jacobian-vector product J·tangents of f at inputs, in forward mode.
+
+    Args:
+        f: Function taking a list of Values and returning a Value or a list of Values
+        inputs: List of input numbers (or Values, whose values are used)
+        tangents: Tangent direction, one number per input
+
+    Returns:
+        tuple: (List[float] outputs, List[float] directional derivatives)
+    """
+    leaves, outputs = _trace(f, inputs)
+    directions = np.asarray(tangents, dtype=float).reshape(len(leaves), 1)
+    output_tangents = _push_tangents(leaves, outputs, directions)
+    return [out.value for out in outputs], [float(t[0]) for t in output_tangents]
+
+
+def jacobian(f, inputs, mode="auto"):
+    """
+    Jacobian of f at inputs.
+
+    Forward mode costs one tangent sweep carrying one direction per input;
+    reverse mode costs one backward pass per output. 'auto' picks forward mode
+    when there are no more inputs than outputs, and reverse mode otherwise.
+
+    Args:
+        f: Function taking a list of Values and returning a Value or a list of Values
+        inputs: List of input numbers (or Values, whose values are used)
+        mode: 'forward', 'reverse' or 'auto'
+
+    Returns:
+        np.ndarray: Array of shape (num_outputs, num_inputs)
+
+    Raises:
+        ValueError: If mode is not one of 'forward', 'reverse' or 'auto'
+    """
+    if mode not in ("forward", "reverse", "auto"):
+        raise ValueError(f"Unknown mode '{mode}', expected 'forward', 'reverse' or 'auto'")
+    leaves, outputs = _trace(f, inputs)
+    if mode == "auto":
+        mode = "forward" if len(leaves) <= len(outputs) else "reverse"
+
+    if mode == "forward":
+        output_tangents = _push_tangents(leaves, outputs, np.eye(len(leaves)))
+        return np.array(output_tangents, dtype=float).reshape(len(outputs), len(leaves))
+
+    # Reverse mode: one backward pass per output. Gradients of other nodes in
+    # the graph (e.g. model parameters) are restored afterwards.
+    topo = _combined_topological_order(outputs)
+    saved = [node.gradient for node in topo]
+    rows = []
+    for out in outputs:
+        for node in topo:
+            node.gradient = 0.0
+        out.backward(retain_graph=True)
+        rows.append([leaf.gradient for leaf in leaves])
+    for node, gradient in zip(topo, saved):
+        node.gradient = gradient
+    return np.array(rows, dtype=float)
+
+
+def _trace(f, inputs):
+    """Call f on fresh leaf Values; return (leaves, list of output Values)."""
+    leaves = [Value(x.value if isinstance(x, Value) else x) for x in inputs]
+    result = f(leaves)
+    outputs = list(result) if isinstance(result, (list, tuple)) else [result]
+    return leaves, outputs
+
+
+def _combined_topological_order(roots):
+    """Topological order of the union of the graphs of several roots."""
+    topo, seen = [], set()
+    for root in roots:
+        for node in _topological_order(root):
+            if node not in seen:
+                seen.add(node)
+                topo.append(node)
+    return topo
+
+
+def _push_tangents(leaves, outputs, directions):
+    """
+    Propagate tangents from the leaves to the outputs.
+
+    Args:
+        leaves: Input Values
+        outputs: Output Values
+        directions: Array of shape (num_inputs, k); row i is the tangent of input i
+
+    Returns:
+        List[np.ndarray]: Tangent (length k) of each output
+    """
+    tangents = {leaf: directions[i] for i, leaf in enumerate(leaves)}
+    rules = _TANGENT_RULES
+    for node in _combined_topological_order(outputs):
+        if node.operation:
+            tangent = rules[node.operation](node, tangents)
+            if tangent is not None:
+                tangents[node] = tangent
+    zero = np.zeros(directions.shape[1])
+    return [tangents.get(out, zero) for out in outputs]
+
+
+# Tangent rules: each one returns the tangent of node from the tangents of its
+# children (None stands for a zero tangent, e.g. of constants and parameters).
+
+def _combine(*terms):
+    """Sum of coefficient * tangent terms, skipping zero (None) tangents."""
+    total = None
+    for coefficient, tangent in terms:
+        if tangent is not None:
+            term = coefficient * tangent
+            total = term if total is None else total + term
+    return total
+
+
+def _tangent_add(node, tangents):
+    a, b = node.children
+    return _combine((1.0, tangents.get(a)), (1.0, tangents.get(b)))
+
+
+def _tangent_sub(node, tangents):
+    a, b = node.children
+    return _combine((1.0, tangents.get(a)), (-1.0, tangents.get(b)))
+
+
+def _tangent_mul(node, tangents):
+    a, b = node.children
+    return _combine((b.value, tangents.get(a)), (a.value, tangents.get(b)))
+
+
+def _tangent_div(node, tangents):
+    a, b = node.children
+    return _combine((1.0 / b.value, tangents.get(a)),
+                    (-a.value / (b.value * b.value), tangents.get(b)))
+
+
+def _tangent_relu(node, tangents):
+    (child,) = node.children
+    return tangents.get(child) if child.value > 0 else None
+
+
+def _tangent_pow(node, tangents):
+    # The exponent is treated as a constant, as in the backward rule
+    child, exponent = node.children
+    return _combine((exponent.value * child.value ** (exponent.value - 1), tangents.get(child)))
+
+
+def _tangent_exp(node, tangents):
+    (child,) = node.children
+    return _combine((node.value, tangents.get(child)))
+
+
+def _tangent_log(node, tangents):
+    (child,) = node.children
+    return _combine((1.0 / child.value, tangents.get(child)))
+
+
+def _tangent_tanh(node, tangents):
+    (child,) = node.children
+    return _combine((1 - node.value**2, tangents.get(child)))
+
+
+def _tangent_linear(node, tangents):
+    # Children are (bias, w1..wn, x1..xn)
+    children = node.children
+    n = len(children) // 2
+    terms = [(1.0, tangents.get(children[0]))]
+    for weight, input_val in zip(children[1:n + 1], children[n + 1:]):
+        terms.append((input_val.value, tangents.get(weight)))
+        terms.append((weight.value, tangents.get(input_val)))
+    return _combine(*terms)
+
+
+_TANGENT_RULES = {
+    "+": _tangent_add,
+    "-": _tangent_sub,
+    "*": _tangent_mul,
+    "/": _tangent_div,
+    "relu": _tangent_relu,
+    "pow": _tangent_pow,
+    "exp": _tangent_exp,
+    "log": _tangent_log,
+    "tanh": _tangent_tanh,
+    "linear": _tangent_linear,
+}
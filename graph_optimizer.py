@@ -0,0 +1,82 @@
+"""
+Optimization pass over a built Value graph.
+
+Graphs built by tracing ordinary Python code contain redundant work: numbers
+used as operands become constant leaves, whole subtrees may depend on
+constants only, and the same expression is often computed more than once.
+optimize_graph() rewrites a graph in place, before backward(), with three
+passes in a single sweep over the topological order:
+
+1. Constant folding: every computed node that depends only on constants is
+   turned into a constant leaf, which drops its subtree from the graph
+2. Constant interning: constant leaves with the same value are merged
+3. Common-subexpression elimination: nodes with the same operation and the
+   same (already deduplicated) children are merged into one node
+
+Gradients of the remaining leaves are unchanged: a merged node receives the
+sum of the gradients its copies would have received.
+"""
+
+from core import _topological_order
+
+# Operations whose result does not depend on the order of the operands
+COMMUTATIVE = frozenset(("+", "*"))
+
+
+def optimize_graph(root):
+    """
+    Fold constants and eliminate duplicate nodes in the graph of root.
+
+    The graph is rewritten in place (children of surviving nodes are redirected
+    to the deduplicated nodes), so root stays valid; call it before backward().
+    Leaves that require a gradient, such as parameters and inputs, are never
+    merged or modified.
+
+    Args:
+        root: The output Value of the graph (e.g. the loss)
+
+    Returns:
+        dict: Graph statistics: nodes before and after, constants folded,
+              duplicate nodes removed, and the number of computed nodes
+              backward() still has to visit
+    """
+    topo = _topological_order(root)
+    canonical = {}  # node -> the node replacing it
+    constants = {}  # (type, repr) of a constant value -> constant leaf
+    expressions = {}  # (operation, child ids) -> computed node
+    folded = 0
+    duplicates = 0
+
+    for node in topo:
+        node._topo = None
+        if node.operation and not node.requires_grad:
+            # Only constants below: keep the value, drop the subtree
+            node.children = ()
+            node.operation = ''
+            folded += 1
+
+        if not node.operation:
+            if node.requires_grad:
+                canonical[node] = node
+                continue
+            key = (type(node.value), repr(node.value))
+            target = constants.setdefault(key, node)
+        else:
+            node.children = tuple(canonical[child] for child in node.children)
+            child_ids = tuple(id(child) for child in node.children)
+            if node.operation in COMMUTATIVE:
+                child_ids = tuple(sorted(child_ids))
+            target = expressions.setdefault((node.operation, child_ids), node)
+
+        if target is not node:
+            duplicates += 1
+        canonical[node] = target
+
+    optimized = _topological_order(root)
+    return {
+        "nodes_before": len(topo),
+        "nodes_after": len(optimized),
+        "constants_folded": folded,
+        "duplicates_removed": duplicates,
+        "backward_nodes": sum(1 for node in optimized if node.operation and node.requires_grad),
+    }
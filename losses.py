@@ -0,0 +1,174 @@
+"""
+Loss functions for batched training.
+
+Each loss takes a batch of predictions (a Tensor, e.g. the output of
+MLP(batch)) and constant targets, and returns the mean loss as a single fused
+Tensor node. The gradient with respect to the predictions is computed in
+closed form during the forward pass (e.g. softmax - onehot for softmax cross
+entropy), so backward() costs one multiply instead of a chain of generic
+elementwise nodes. All losses are computed in a numerically stable way.
+"""
+
+import numpy as np
+
+from core import is_grad_enabled
+from tensor import Tensor, _BACKWARD_RULES
+
+
+def mse(predictions, targets):
+    """
+    Mean squared error: mean((predictions - targets)^2).
+
+    Args:
+        predictions: Tensor of predictions
+        targets: Targets with the same shape (array-like or Tensor)
+
+    Returns:
+        Tensor: Scalar loss
+    """
+    predictions, targets = _prepare(predictions, targets)
+    residual = predictions.value - targets
+    return _fused_loss(
+        predictions, np.mean(residual * residual), "mse",
+        lambda: 2.0 * residual / residual.size
+    )
+
+
+def mae(predictions, targets):
+    """
+    Mean absolute error: mean(|predictions - targets|).
+
+    Args:
+        predictions: Tensor of predictions
+        targets: Targets with the same shape (array-like or Tensor)
+
+    Returns:
+        Tensor: Scalar loss
+    """
+    predictions, targets = _prepare(predictions, targets)
+    residual = predictions.value - targets
+    return _fused_loss(
+        predictions, np.mean(np.abs(residual)), "mae",
+        lambda: np.sign(residual) / residual.size
+    )
+
+
+def huber(predictions, targets, delta=1.0):
+    """
+    Huber loss: quadratic for residuals within delta, linear beyond.
+
+    Args:
+        predictions: Tensor of predictions
+        targets: Targets with the same shape (array-like or Tensor)
+        delta: Residual size where the loss switches from quadratic to linear
+
+    Returns:
+        Tensor: Scalar loss
+    """
+    predictions, targets = _prepare(predictions, targets)
+    residual = predictions.value - targets
+    magnitude = np.abs(residual)
+    losses = np.where(magnitude <= delta, 0.5 * residual * residual, delta * (magnitude - 0.5 * delta))
+    return _fused_loss(
+        predictions, np.mean(losses), "huber",
+        lambda: np.clip(residual, -delta, delta) / residual.size
+    )
+
+
+def binary_cross_entropy(logits, targets):
+    """
+    Binary cross entropy on logits (predictions before the sigmoid).
+
+    Computed as max(z, 0) - z*t + log(1 + exp(-|z|)), which never overflows.
+    The gradient is (sigmoid(z) - t) / N.
+
+    Args:
+        logits: Tensor of raw model outputs
+        targets: Targets in [0, 1] with the same shape (array-like or Tensor)
+
+    Returns:
+        Tensor: Scalar loss
+    """
+    logits, targets = _prepare(logits, targets)
+    z = logits.value
+    losses = np.maximum(z, 0.0) - z * targets + np.log1p(np.exp(-np.abs(z)))
+    return _fused_loss(
+        logits, np.mean(losses), "binary_cross_entropy",
+        lambda: (sigmoid(z) - targets) / z.size
+    )
+
+
+def softmax_cross_entropy(logits, targets):
+    """
+    Softmax cross entropy on logits of shape (batch, classes).
+
+    Computed with the log-sum-exp trick. The gradient is
+    (softmax(logits) - targets) / batch.
+
+    Args:
+        logits: Tensor of shape (batch, classes)
+        targets: Class indices of shape (batch,), or target probabilities
+                 (e.g. one-hot) of shape (batch, classes)
+
+    Returns:
+        Tensor: Scalar loss
+    """
+    logits = logits if isinstance(logits, Tensor) else Tensor(logits, requires_grad=False)
+    z = logits.value
+    targets = targets.value if isinstance(targets, Tensor) else np.asarray(targets)
+    if targets.ndim == 1:
+        targets = np.eye(z.shape[-1])[targets.astype(int)]
+    targets = targets.astype(float)
+
+    shifted = z - z.max(axis=-1, keepdims=True)
+    log_probabilities = shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+    batch_size = z.shape[0]
+    return _fused_loss(
+        logits, -np.sum(targets * log_probabilities) / batch_size, "softmax_cross_entropy",
+        lambda: (np.exp(log_probabilities) - targets) / batch_size
+    )
+
+
+def sigmoid(x):
+    """Numerically stable logistic sigmoid of an array (or Tensor value)."""
+    x = x.value if isinstance(x, Tensor) else np.asarray(x, dtype=float)
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+
+
+def softmax(x, axis=-1):
+    """Numerically stable softmax of an array (or Tensor value) along axis."""
+    x = x.value if isinstance(x, Tensor) else np.asarray(x, dtype=float)
+    e = np.exp(x - x.max(axis=axis, keepdims=True))
+    return e / e.sum(axis=axis, keepdims=True)
+
+
+def _prepare(predictions, targets):
+    """Wrap predictions in a Tensor and broadcast targets to their shape."""
+    predictions = predictions if isinstance(predictions, Tensor) else Tensor(predictions, requires_grad=False)
+    targets = targets.value if isinstance(targets, Tensor) else np.asarray(targets, dtype=float)
+    return predictions, np.broadcast_to(targets, predictions.shape)
+
+
+def _fused_loss(predictions, value, operation, local_gradient):
+    """
+    Create the scalar loss node.
+
+    local_gradient computes d(loss)/d(predictions); it is only evaluated when
+    the graph is recorded (not inside no_grad()).
+    """
+    result = Tensor(value=value, children=(predictions,), operation=operation)
+    if is_grad_enabled():
+        result._context = local_gradient()
+    return result
+
+
+def _backward_fused_loss(node):
+    # The closed-form gradient was stored by the forward pass
+    (child,) = node.children
+    child.gradient = child.gradient + node.gradient * node._context
+
+
+# Register the fused losses in the Tensor op table
+for _operation in ("mse", "mae", "huber", "binary_cross_entropy", "softmax_cross_entropy"):
+    _BACKWARD_RULES[_operation] = _backward_fused_loss
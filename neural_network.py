@@ -5,8 +5,61 @@ This module provides high-level neural network components including neurons,
 layers, and multi-layer perceptrons.
 """
 
+import math
 import random
-from core import Value
+
+import numpy as np
+
+from checkpoint import ACTIVATIONS, read_checkpoint, write_checkpoint
+from core import Value, linear
+from sparse import SparseRows
+from tensor import (Tensor, _csr_matmul, _sparse_rows_matmul, parameter_tensor, sparse_input_matmul,
+                    sparse_matmul)
+
+
+# Activations MLP supports for its hidden layers, applied to plain floats
+# (Value, Tensor and checkpoint.ACTIVATIONS provide the same functions)
+HIDDEN_ACTIVATIONS = {
+    "tanh": math.tanh,
+    "relu": lambda x: x if x > 0 else 0.0,
+}
+
+
+def _touched_weights(neurons, touched):
+    """
+    Weights connecting the given input positions to each neuron.
+    
+    Returns a flat row-major list of shape (len(touched), len(neurons));
+    connections removed by pruning are filled with a zero constant.
+    """
+    if all(neuron.indices is None for neuron in neurons):
+        return [neuron.weights[i] for i in touched for neuron in neurons]
+    zero = Value(0.0, requires_grad=False)
+    lookups = [neuron._weight_lookup() for neuron in neurons]
+    return [lookup.get(i, zero) for i in touched for lookup in lookups]
+
+
+def _sparse_forward(rows, neurons):
+    """SparseRows batch times the neurons' weights, reading only the inputs the batch uses."""
+    touched, local = rows.compact()
+    weights = parameter_tensor(_touched_weights(neurons, touched.tolist()), shape=(len(touched), len(neurons)))
+    return sparse_input_matmul(rows.indptr, local, rows.values, weights)
+
+
+def _is_batch(inputs):
+    """
+    Check whether inputs is a 2-D minibatch rather than a single sample.
+    
+    A batch is a 2-D Tensor or array, a list whose rows are lists/arrays, or
+    SparseRows. A dict {index: value} is a single sparse sample.
+    """
+    if isinstance(inputs, dict):
+        return False
+    if isinstance(inputs, Tensor) or hasattr(inputs, 'ndim'):
+        return inputs.ndim == 2
+    if len(inputs) == 0:
+        return False
+    return isinstance(inputs[0], (list, tuple)) or getattr(inputs[0], 'ndim', 0) == 1
 
 
 class Neuron:
@@ -17,36 +70,81 @@ class Neuron:
     This is the fundamental building block of neural networks.
     """
     
-    def __init__(self, num_inputs):
+    def __init__(self, num_inputs, rng=None):
         """
         Initialize a neuron with random weights and bias.
         
         Args:
             num_inputs: Number of input connections
+            rng: random.Random instance to draw the initial values from
+                 (defaults to the global random module)
         """
+        rng = rng or random
         # Initialize weights and bias with small random values
-        self.weights = [Value(random.uniform(-1, 1)) for _ in range(num_inputs)]
-        self.bias = Value(random.uniform(-1, 1))
+        self.weights = [Value(rng.uniform(-1, 1)) for _ in range(num_inputs)]
+        self.bias = Value(rng.uniform(-1, 1))
+        # Input position of each weight once the neuron is pruned (None: all inputs)
+        self.indices = None
+        self._lookup = None  # Input position -> weight (see _weight_lookup)
     
     def __call__(self, inputs):
         """
         Forward pass: w1*x1 + w2*x2 + ... + wn*xn + bias.
         
+        Sparse inputs (a dict {index: value}, or SparseRows for a batch) only
+        touch the weights of their nonzero entries.
+        
         Args:
-            inputs: List of input values (can be scalars or Value objects)
+            inputs: List of input values (can be scalars or Value objects),
+                    a dict {index: value} of the nonzero inputs, or a 2-D batch
+                    of numeric rows (list of lists, array, Tensor or SparseRows)
             
         Returns:
             Value: The weighted sum plus bias
+            (Tensor of shape (batch,) for a batch)
         """
-        # Ensure inputs are Value objects
-        inputs = [x if isinstance(x, Value) else Value(x) for x in inputs]
+        if _is_batch(inputs):
+            bias = parameter_tensor([self.bias], shape=())
+            if isinstance(inputs, SparseRows):
+                return _sparse_forward(inputs, [self]).reshape(-1) + bias
+            inputs = inputs if isinstance(inputs, Tensor) else Tensor(inputs, requires_grad=False)
+            weights = parameter_tensor(self.weights)
+            if self.indices is not None:
+                indptr = np.array([0, len(self.weights)])
+                return sparse_matmul(inputs, weights, indptr, np.array(self.indices, dtype=int)).reshape(-1) + bias
+            return inputs @ weights + bias
         
-        # Compute weighted sum
-        weighted_sum = self.bias
-        for weight, input_val in zip(self.weights, inputs):
-            weighted_sum = weighted_sum + weight * input_val
+        # Ensure inputs are Value objects. Raw numbers are data, so they become
+        # constant leaves (not interned, since data values rarely repeat)
+        weights, inputs = self._terms(inputs)
+        inputs = [x if isinstance(x, Value) else Value(x, requires_grad=False) for x in inputs]
+        
+        # Compute weighted sum as a single fused node
+        return linear(weights, inputs, self.bias)
+    
+    def _terms(self, inputs):
+        """
+        Return the (weights, inputs) lists of the weighted sum.
         
-        return weighted_sum
+        Weights removed by pruning and the zero entries of a sparse (dict)
+        input are left out.
+        """
+        if isinstance(inputs, dict):
+            if self.indices is None:
+                return [self.weights[i] for i in inputs], list(inputs.values())
+            lookup = self._weight_lookup()
+            present = [i for i in inputs if i in lookup]
+            return [lookup[i] for i in present], [inputs[i] for i in present]
+        if self.indices is None:
+            return self.weights, inputs
+        return self.weights, [inputs[i] for i in self.indices]
+    
+    def _weight_lookup(self):
+        """Map from input position to weight (cached until the neuron is pruned again)."""
+        if self._lookup is None:
+            positions = range(len(self.weights)) if self.indices is None else self.indices
+            self._lookup = dict(zip(positions, self.weights))
+        return self._lookup
     
     def parameters(self):
         """
@@ -56,6 +154,12 @@ class Neuron:
             List[Value]: All trainable parameters
         """
         return self.weights + [self.bias]
+    
+    def zero_grad(self):
+        """Reset the gradients of this neuron's weights and bias to zero."""
+        for weight in self.weights:
+            weight.gradient = 0.0
+        self.bias.gradient = 0.0
 
 
 class Layer:
@@ -66,26 +170,58 @@ class Layer:
     Each neuron in the layer receives the same inputs but has different weights.
     """
     
-    def __init__(self, num_inputs, num_outputs):
+    def __init__(self, num_inputs, num_outputs, rng=None):
         """
         Initialize a layer with the specified number of neurons.
         
         Args:
             num_inputs: Number of input connections per neuron
             num_outputs: Number of neurons in the layer
+            rng: random.Random instance for the initial weights (see Neuron)
         """
-        self.neurons = [Neuron(num_inputs) for _ in range(num_outputs)]
+        self.num_inputs = num_inputs
+        self.neurons = [Neuron(num_inputs, rng) for _ in range(num_outputs)]
+        # CSR layout of the connections once the layer is pruned (None: dense)
+        self.indptr = None
+        self.indices = None
     
     def __call__(self, inputs):
         """
         Forward pass through the layer.
         
+        A 2-D batch is computed in one vectorized pass: the weights of all
+        neurons are packed into a single (num_inputs, num_outputs) matrix, or
+        into one CSR matrix holding only the remaining weights once the layer
+        is pruned.
+        
         Args:
-            inputs: List of input values
+            inputs: List of input values, a dict {index: value} of the nonzero
+                    inputs, or a 2-D batch of numeric rows (list of lists,
+                    array, Tensor or SparseRows)
             
         Returns:
             Value or List[Value]: Output of the layer
+            (Tensor of shape (batch, num_outputs) for a batch)
         """
+        if _is_batch(inputs):
+            bias = parameter_tensor([neuron.bias for neuron in self.neurons])
+            if isinstance(inputs, SparseRows):
+                return _sparse_forward(inputs, self.neurons) + bias
+            inputs = inputs if isinstance(inputs, Tensor) else Tensor(inputs, requires_grad=False)
+            if self.indptr is not None:
+                weights = parameter_tensor([w for neuron in self.neurons for w in neuron.weights])
+                return sparse_matmul(inputs, weights, self.indptr, self.indices) + bias
+            weights = parameter_tensor(
+                [neuron.weights[i] for i in range(self.num_inputs) for neuron in self.neurons],
+                shape=(self.num_inputs, len(self.neurons))
+            )
+            return inputs @ weights + bias
+        
+        # Wrap raw numbers once, so all neurons share the same constant leaves
+        if isinstance(inputs, dict):
+            inputs = {i: x if isinstance(x, Value) else Value(x, requires_grad=False) for i, x in inputs.items()}
+        else:
+            inputs = [x if isinstance(x, Value) else Value(x, requires_grad=False) for x in inputs]
         outputs = [neuron(inputs) for neuron in self.neurons]
         return outputs[0] if len(outputs) == 1 else outputs
     
@@ -100,6 +236,51 @@ class Layer:
         for neuron in self.neurons:
             params.extend(neuron.parameters())
         return params
+    
+    def zero_grad(self):
+        """Reset the gradients of all parameters in this layer to zero."""
+        for neuron in self.neurons:
+            neuron.zero_grad()
+    
+    def prune(self, keep):
+        """
+        Remove connections and switch the layer to a sparse (CSR) layout.
+        
+        Each neuron keeps only the weights where keep is True, along with
+        the input position of each weight, so forward and backward passes
+        only touch the remaining connections. Connections removed by an
+        earlier prune() stay removed. Since parameters() changes, create
+        optimizers after pruning.
+        
+        Args:
+            keep: Boolean array of shape (num_inputs, num_outputs) over all
+                  connections of the layer
+        """
+        for j, neuron in enumerate(self.neurons):
+            positions = range(self.num_inputs) if neuron.indices is None else neuron.indices
+            kept = [(i, w) for i, w in zip(positions, neuron.weights) if keep[i, j]]
+            neuron.indices = [i for i, _ in kept]
+            neuron.weights = [w for _, w in kept]
+            neuron._lookup = None
+        self.indptr = np.cumsum([0] + [len(neuron.weights) for neuron in self.neurons])
+        self.indices = np.array([i for neuron in self.neurons for i in neuron.indices], dtype=int)
+    
+    def _weight_array(self):
+        """Current weights as a plain (num_inputs, num_outputs) array (zeros where pruned)."""
+        if self.indptr is None:
+            return np.array([[w.value for w in neuron.weights] for neuron in self.neurons]).T
+        weights = np.zeros((self.num_inputs, len(self.neurons)))
+        for j, neuron in enumerate(self.neurons):
+            weights[neuron.indices, j] = [w.value for w in neuron.weights]
+        return weights
+    
+    def _sparse_weight_values(self):
+        """Current weights in CSR order, as a plain array."""
+        return np.array([w.value for neuron in self.neurons for w in neuron.weights])
+    
+    def _bias_array(self):
+        """Current biases as a plain (num_outputs,) array."""
+        return np.array([neuron.bias.value for neuron in self.neurons])
 
 
 class MLP:
@@ -110,32 +291,60 @@ class MLP:
     Each layer (except the last) applies an activation function to its outputs.
     """
     
-    def __init__(self, layer_sizes):
+    def __init__(self, layer_sizes, activation="tanh", rng=None):
         """
         Initialize a multi-layer perceptron.
         
         Args:
             layer_sizes: List of integers specifying the size of each layer.
                         e.g., [3, 4, 4, 1] for 3 inputs, 2 hidden layers of 4 neurons each, 1 output
+            activation: Activation of the hidden layers: 'tanh' or 'relu'
+            rng: random.Random instance for the initial weights, to make
+                 them reproducible (defaults to the global random module)
+            
+        Raises:
+            ValueError: If the activation is not supported
         """
+        if activation not in HIDDEN_ACTIVATIONS:
+            raise ValueError(f"Unknown activation '{activation}', expected one of {sorted(HIDDEN_ACTIVATIONS)}")
+        self.layer_sizes = list(layer_sizes)
+        self.activation = activation
         self.layers = []
         for i in range(len(layer_sizes) - 1):
-            self.layers.append(Layer(layer_sizes[i], layer_sizes[i + 1]))
+            self.layers.append(Layer(layer_sizes[i], layer_sizes[i + 1], rng))
     
     def __call__(self, inputs):
         """
         Forward pass through the entire network.
         
+        Passing a 2-D batch runs the whole batch through one vectorized graph.
+        Calling backward() on a loss built from it (e.g. a mean over the batch)
+        fills the gradients of the same parameters as the per-sample path.
+        
+        Sparse inputs (see sparse) only touch the first-layer weights of
+        their nonzero entries, in the forward and the backward pass.
+        
         Args:
-            inputs: List of input values
+            inputs: List of input values, a dict {index: value} of the nonzero
+                    inputs, or a 2-D batch of numeric rows (list of lists,
+                    array, Tensor or SparseRows)
             
         Returns:
             Value: The network's output
+            (Tensor of shape (batch,) for a batch, or (batch, outputs)
+            if the last layer has more than one neuron)
         """
+        if _is_batch(inputs):
+            x = inputs
+            for layer in self.layers[:-1]:
+                x = getattr(layer(x), self.activation)()
+            x = self.layers[-1](x)
+            return x.reshape(-1) if x.shape[1] == 1 else x
+        
         x = inputs
         for layer in self.layers[:-1]:  # All layers except the last
             x = layer(x)
-            x = [val.tanh() for val in (x if isinstance(x, list) else [x])]  # Apply tanh activation
+            x = [getattr(val, self.activation)() for val in (x if isinstance(x, list) else [x])]  # Apply activation
             x = x[0] if len(x) == 1 else x
         
         # Last layer (no activation for regression, or add softmax for classification)
@@ -152,3 +361,116 @@ class MLP:
         for layer in self.layers:
             params.extend(layer.parameters())
         return params
+    
+    def zero_grad(self):
+        """
+        Reset the gradients of all parameters in the network to zero.
+        
+        Only the parameters are touched, so this costs O(#params) regardless
+        of how large the computational graph built from them is.
+        """
+        for layer in self.layers:
+            layer.zero_grad()
+    
+    def predict(self, inputs):
+        """
+        Gradient-free forward pass for inference.
+        
+        Computes the same result as calling the network, but on plain floats
+        (or a NumPy array for a batch) without creating any Value or Tensor
+        nodes, so no computational graph is built or kept alive.
+        
+        Args:
+            inputs: List of input values, a dict {index: value} of the nonzero
+                    inputs, or a 2-D batch of numeric rows (or SparseRows)
+            
+        Returns:
+            float or List[float]: The network's output
+            (np.ndarray of shape (batch,) or (batch, outputs) for a batch)
+        """
+        last = len(self.layers) - 1
+        if _is_batch(inputs):
+            if isinstance(inputs, SparseRows):
+                x = inputs
+            else:
+                x = inputs.value if isinstance(inputs, Tensor) else np.asarray(inputs, dtype=float)
+            for i, layer in enumerate(self.layers):
+                if isinstance(x, SparseRows):
+                    touched, local = x.compact()
+                    weights = np.array([w.value for w in _touched_weights(layer.neurons, touched.tolist())])
+                    x = _sparse_rows_matmul(x.indptr, local, x.values, weights.reshape(len(touched), len(layer.neurons)))
+                elif layer.indptr is not None:
+                    x = _csr_matmul(x, layer._sparse_weight_values(), layer.indptr, layer.indices)
+                else:
+                    x = x @ layer._weight_array()
+                x = x + layer._bias_array()
+                if i < last:
+                    x = ACTIVATIONS[self.activation](x)
+            return x[:, 0] if x.shape[1] == 1 else x
+        
+        if isinstance(inputs, dict):
+            x = {i: v.value if isinstance(v, Value) else v for i, v in inputs.items()}
+        else:
+            x = [v.value if isinstance(v, Value) else v for v in inputs]
+        for i, layer in enumerate(self.layers):
+            x = [
+                neuron.bias.value + sum(w.value * xi for w, xi in zip(*neuron._terms(x)))
+                for neuron in layer.neurons
+            ]
+            if i < last:
+                x = [HIDDEN_ACTIVATIONS[self.activation](v) for v in x]
+        return x[0] if len(x) == 1 else x
+    
+    def activations(self):
+        """
+        Return the name of the activation applied after each layer.
+        
+        Returns:
+            List[str]: The activation for every hidden layer, linear for the
+                       output layer
+        """
+        return [self.activation] * (len(self.layers) - 1) + ["linear"]
+    
+    def save(self, path):
+        """
+        Save the network to a compact binary checkpoint (see checkpoint).
+        
+        Pruned layers are stored densely, with zeros for removed weights.
+        
+        Args:
+            path: Destination file path
+        """
+        write_checkpoint(path, self.layer_sizes, self.activations(), self._flat_values())
+    
+    def _flat_values(self):
+        """All parameter values in checkpoint order (each neuron's weights, then its bias)."""
+        return np.concatenate([
+            np.column_stack([layer._weight_array().T, layer._bias_array()]).ravel()
+            for layer in self.layers
+        ])
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Load a network saved with save().
+        
+        For inference-only use, checkpoint.FrozenMLP.load memory-maps the file
+        instead of creating Value objects for every parameter.
+        
+        Args:
+            path: Checkpoint file path
+            
+        Returns:
+            MLP: The loaded network
+            
+        Raises:
+            ValueError: If the checkpoint uses activations MLP does not support
+        """
+        header, data = read_checkpoint(path)
+        activations = header["activations"]
+        model = cls(header["layer_sizes"], activation=activations[0] if len(activations) > 1 else "tanh")
+        if activations != model.activations():
+            raise ValueError(f"Unsupported activations for MLP: {header['activations']}")
+        for param, value in zip(model.parameters(), data.tolist()):
+            param.value = value
+        return model
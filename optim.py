@@ -0,0 +1,146 @@
+"""
+Optimizers for training networks built from Value parameters.
+
+Each optimizer collects the parameters once and keeps its state (velocities,
+moment estimates) in contiguous NumPy arrays, so step() updates all
+parameters with a few array operations instead of a Python expression per
+parameter.
+"""
+
+import numpy as np
+
+
+class Optimizer:
+    """
+    Base class for optimizers.
+
+    Subclasses implement _update(values, gradients), which returns the new
+    parameter values given the current values and gradients as flat arrays.
+    """
+
+    def __init__(self, parameters, lr):
+        """
+        Initialize the optimizer.
+
+        Args:
+            parameters: Iterable of Value objects to optimize (e.g. model.parameters())
+            lr: Learning rate
+        """
+        self.parameters = list(parameters)
+        self.lr = lr
+
+    def step(self):
+        """Update every parameter using its current gradient."""
+        count = len(self.parameters)
+        values = np.fromiter((p.value for p in self.parameters), dtype=float, count=count)
+        gradients = np.fromiter((p.gradient for p in self.parameters), dtype=float, count=count)
+        new_values = self._update(values, gradients)
+        for param, value in zip(self.parameters, new_values.tolist()):
+            param.value = value
+
+    def zero_grad(self):
+        """Reset the gradients of all parameters to zero."""
+        for param in self.parameters:
+            param.gradient = 0.0
+
+    def _update(self, values, gradients):
+        raise NotImplementedError
+
+
+class SGD(Optimizer):
+    """
+    Stochastic gradient descent, optionally with (Nesterov) momentum.
+
+    velocity = momentum * velocity + gradient
+    value -= lr * velocity
+    """
+
+    def __init__(self, parameters, lr=0.01, momentum=0.0, nesterov=False):
+        """
+        Initialize SGD.
+
+        Args:
+            parameters: Iterable of Value objects to optimize
+            lr: Learning rate
+            momentum: Momentum factor (0 disables momentum)
+            nesterov: Use Nesterov momentum
+        """
+        super().__init__(parameters, lr)
+        self.momentum = momentum
+        self.nesterov = nesterov
+        self.velocity = np.zeros(len(self.parameters))
+
+    def _update(self, values, gradients):
+        if not self.momentum:
+            return values - self.lr * gradients
+        self.velocity *= self.momentum
+        self.velocity += gradients
+        if self.nesterov:
+            return values - self.lr * (gradients + self.momentum * self.velocity)
+        return values - self.lr * self.velocity
+
+
+class RMSProp(Optimizer):
+    """
+    RMSProp: scale each step by a running average of squared gradients.
+
+    square_avg = alpha * square_avg + (1 - alpha) * gradient^2
+    value -= lr * gradient / (sqrt(square_avg) + eps)
+    """
+
+    def __init__(self, parameters, lr=0.01, alpha=0.99, eps=1e-8):
+        """
+        Initialize RMSProp.
+
+        Args:
+            parameters: Iterable of Value objects to optimize
+            lr: Learning rate
+            alpha: Smoothing constant of the squared-gradient average
+            eps: Term added to the denominator for numerical stability
+        """
+        super().__init__(parameters, lr)
+        self.alpha = alpha
+        self.eps = eps
+        self.square_avg = np.zeros(len(self.parameters))
+
+    def _update(self, values, gradients):
+        self.square_avg *= self.alpha
+        self.square_avg += (1 - self.alpha) * gradients * gradients
+        return values - self.lr * gradients / (np.sqrt(self.square_avg) + self.eps)
+
+
+class Adam(Optimizer):
+    """
+    Adam: momentum on the gradient plus RMSProp-style scaling, bias-corrected.
+
+    m = beta1 * m + (1 - beta1) * gradient
+    v = beta2 * v + (1 - beta2) * gradient^2
+    value -= lr * m_hat / (sqrt(v_hat) + eps)
+    """
+
+    def __init__(self, parameters, lr=0.001, betas=(0.9, 0.999), eps=1e-8):
+        """
+        Initialize Adam.
+
+        Args:
+            parameters: Iterable of Value objects to optimize
+            lr: Learning rate
+            betas: Decay rates of the first and second moment estimates
+            eps: Term added to the denominator for numerical stability
+        """
+        super().__init__(parameters, lr)
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+        self.m = np.zeros(len(self.parameters))
+        self.v = np.zeros(len(self.parameters))
+        self.t = 0
+
+    def _update(self, values, gradients):
+        self.t += 1
+        self.m *= self.beta1
+        self.m += (1 - self.beta1) * gradients
+        self.v *= self.beta2
+        self.v += (1 - self.beta2) * gradients * gradients
+        m_hat = self.m / (1 - self.beta1 ** self.t)
+        v_hat = self.v / (1 - self.beta2 ** self.t)
+        return values - self.lr * m_hat / (np.sqrt(v_hat) + self.eps)
@@ -0,0 +1,158 @@
+"""
+Data-parallel training across CPU cores.
+
+The scalar engine is single-threaded and bound by the GIL, so this module
+splits each minibatch across a pool of worker processes. Every worker holds
+its own replica of the model and runs forward/backward on its shard.
+Parameters and gradients are exchanged through shared memory rather than
+being pickled on every step; only the data shards travel through the pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from losses import mse
+
+
+class DataParallelTrainer:
+    """
+    Train a model on minibatches split across a process pool.
+
+    Each step:
+    1. The master parameter values are written into a shared buffer
+    2. The batch is split into one shard per worker
+    3. Each worker loads the shared parameters into its replica, runs
+       forward/backward on its shard, and writes its gradients into its own
+       row of a shared gradient buffer
+    4. The rows are summed, averaged over the batch, stored in the master
+       parameters' gradients, and the optimizer takes a step
+
+    The loss function must be picklable (a module-level function, not a
+    lambda) and return the mean loss over the samples it is given.
+
+    Use the trainer as a context manager (or call close()) to shut down the
+    pool and release the shared memory. On platforms that spawn processes,
+    create it under `if __name__ == '__main__':`.
+    """
+
+    def __init__(self, model, optimizer, loss_fn=None, num_workers=None):
+        """
+        Start the worker pool.
+
+        Args:
+            model: The master model (an MLP); workers receive a copy of it once
+            optimizer: Optimizer over model.parameters() (see optim)
+            loss_fn: Function (predictions, targets) -> mean loss over the batch.
+                     Defaults to losses.mse.
+            num_workers: Number of worker processes (defaults to the CPU count)
+        """
+        self.model = model
+        self.optimizer = optimizer
+        self.loss_fn = loss_fn or mse
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.parameters = model.parameters()
+
+        num_params = len(self.parameters)
+        itemsize = np.dtype(float).itemsize
+        self._param_memory = shared_memory.SharedMemory(create=True, size=num_params * itemsize)
+        self._grad_memory = shared_memory.SharedMemory(
+            create=True, size=self.num_workers * num_params * itemsize
+        )
+        self._param_buffer = np.ndarray((num_params,), dtype=float, buffer=self._param_memory.buf)
+        self._grad_buffer = np.ndarray(
+            (self.num_workers, num_params), dtype=float, buffer=self._grad_memory.buf
+        )
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_init_worker,
+            initargs=(model, self.loss_fn, self._param_memory.name, self._grad_memory.name,
+                      num_params, self.num_workers),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def step(self, inputs, targets):
+        """
+        Run one data-parallel training step on a minibatch.
+
+        Args:
+            inputs: 2-D batch of input rows (list of lists or array)
+            targets: Targets for each row
+
+        Returns:
+            float: The mean loss over the batch (before the update)
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        targets = np.asarray(targets, dtype=float)
+        batch_size = len(inputs)
+
+        self._param_buffer[:] = [p.value for p in self.parameters]
+        shards = [
+            (slot, shard_inputs, shard_targets)
+            for slot, (shard_inputs, shard_targets) in enumerate(zip(
+                np.array_split(inputs, self.num_workers),
+                np.array_split(targets, self.num_workers),
+            ))
+            if len(shard_inputs)
+        ]
+        futures = [self._pool.submit(_worker_step, *shard) for shard in shards]
+        loss_sum = sum(future.result() for future in futures)
+
+        slots = [slot for slot, _, _ in shards]
+        gradients = self._grad_buffer[slots].sum(axis=0) / batch_size
+        for param, gradient in zip(self.parameters, gradients.tolist()):
+            param.gradient = gradient
+        self.optimizer.step()
+        return loss_sum / batch_size
+
+    def close(self):
+        """Shut down the worker pool and release the shared memory."""
+        self._pool.shutdown()
+        del self._param_buffer, self._grad_buffer
+        for memory in (self._param_memory, self._grad_memory):
+            memory.close()
+            memory.unlink()
+
+
+# State of a worker process, set up once by _init_worker
+_worker_state = {}
+
+
+def _init_worker(model, loss_fn, param_name, grad_name, num_params, num_slots):
+    param_memory = shared_memory.SharedMemory(name=param_name)
+    grad_memory = shared_memory.SharedMemory(name=grad_name)
+    _worker_state.update(
+        model=model,
+        parameters=model.parameters(),
+        loss_fn=loss_fn,
+        # Keep the SharedMemory objects alive as long as the arrays using them
+        memory=(param_memory, grad_memory),
+        param_buffer=np.ndarray((num_params,), dtype=float, buffer=param_memory.buf),
+        grad_buffer=np.ndarray((num_slots, num_params), dtype=float, buffer=grad_memory.buf),
+    )
+
+
+def _worker_step(slot, inputs, targets):
+    """Forward/backward on one shard; returns the summed (not mean) loss."""
+    state = _worker_state
+    parameters = state['parameters']
+    for param, value in zip(parameters, state['param_buffer'].tolist()):
+        param.value = value
+        param.gradient = 0.0
+
+    loss = state['loss_fn'](state['model'](inputs), targets)
+    loss.backward()
+
+    count = len(inputs)
+    state['grad_buffer'][slot] = np.fromiter(
+        (p.gradient for p in parameters), dtype=float, count=len(parameters)
+    ) * count
+    return float(loss.value) * count
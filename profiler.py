@@ -0,0 +1,229 @@
+"""
+Opt-in profiling of the scalar autograd engine.
+
+While a Profiler is active it wraps the Value operations, the backward rules
+in core._BACKWARD_RULES and Value.backward with timing code. It records:
+- the number of nodes created per operation
+- call counts and time spent in each forward operation and backward rule
+- graph size, depth and time of every backward() call
+
+Nothing is wrapped while no Profiler is active, so the instrumentation costs
+nothing when it is switched off.
+
+Example:
+    with Profiler() as prof:
+        loss = (model(x) - y).pow(2)
+        loss.backward()
+    print(prof.summary())
+"""
+
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+
+import core
+from core import Value
+
+# Forward operations to time: operation name -> Value method
+FORWARD_METHODS = {
+    "+": "__add__",
+    "-": "__sub__",
+    "*": "__mul__",
+    "/": "__truediv__",
+    "pow": "pow",
+    "exp": "exp",
+    "log": "log",
+    "tanh": "tanh",
+    "relu": "relu",
+}
+
+# Modules that hold a reference to core.linear (imported by name)
+LINEAR_MODULES = ("core", "neural_network")
+
+
+def best_time(run, setup=None, repeat=5):
+    """
+    Best wall-clock time of run(state) over several repeats.
+
+    Args:
+        run: Function to time, called with the result of setup() (or None)
+        setup: Optional untimed function run before each repeat
+        repeat: Number of repeats
+
+    Returns:
+        float: The shortest time, in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Profiler:
+    """
+    Collects per-operation statistics while active.
+
+    Only one Profiler can be active at a time.
+    """
+
+    _active = None
+
+    def __init__(self, trace=False):
+        """
+        Initialize a profiler.
+
+        Args:
+            trace: Also record every call as an event for export_chrome_trace()
+                   (costs memory proportional to the number of calls)
+        """
+        self.trace = trace
+        self.node_counts = Counter()  # operation -> nodes created ('' for leaves)
+        self.forward_stats = defaultdict(lambda: [0, 0.0])  # operation -> [calls, seconds]
+        self.backward_stats = defaultdict(lambda: [0, 0.0])  # operation -> [calls, seconds]
+        self.backward_calls = []  # one dict per Value.backward() call
+        self.events = []  # Chrome trace events (if trace is set)
+        self._originals = []  # (owner, name, original) to restore on stop()
+        self._start_time = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Install the instrumentation."""
+        if Profiler._active is not None:
+            raise RuntimeError("Another Profiler is already active")
+        Profiler._active = self
+        self._start_time = time.perf_counter()
+
+        self._patch(Value, "__init__", self._wrap_init(Value.__init__))
+        for operation, method in FORWARD_METHODS.items():
+            self._patch(Value, method, self._wrap_timed(getattr(Value, method), operation, "forward"))
+        linear = core.linear
+        timed_linear = self._wrap_timed(linear, "linear", "forward")
+        for module_name in LINEAR_MODULES:
+            module = sys.modules.get(module_name)
+            if module is not None and getattr(module, "linear", None) is linear:
+                self._patch(module, "linear", timed_linear)
+        self._patch(Value, "backward", self._wrap_backward(Value.backward))
+        for operation, rule in list(core._BACKWARD_RULES.items()):
+            self._patch(core._BACKWARD_RULES, operation, self._wrap_timed(rule, operation, "backward"))
+
+    def stop(self):
+        """Remove the instrumentation, restoring the original functions."""
+        for owner, name, original in reversed(self._originals):
+            if isinstance(owner, dict):
+                owner[name] = original
+            else:
+                setattr(owner, name, original)
+        self._originals = []
+        Profiler._active = None
+
+    def _patch(self, owner, name, replacement):
+        if isinstance(owner, dict):
+            self._originals.append((owner, name, owner[name]))
+            owner[name] = replacement
+        else:
+            self._originals.append((owner, name, getattr(owner, name)))
+            setattr(owner, name, replacement)
+
+    def _record(self, stats, operation, category, start, end):
+        entry = stats[operation]
+        entry[0] += 1
+        entry[1] += end - start
+        if self.trace:
+            self.events.append({
+                "name": operation, "cat": category, "ph": "X", "pid": 0, "tid": 0,
+                "ts": (start - self._start_time) * 1e6, "dur": (end - start) * 1e6,
+            })
+
+    def _wrap_init(self, original):
+        counts = self.node_counts
+
+        def __init__(node, value, children=(), operation='', label='', requires_grad=True):
+            counts[operation] += 1
+            original(node, value, children, operation, label, requires_grad)
+        return __init__
+
+    def _wrap_timed(self, original, operation, category):
+        stats = self.forward_stats if category == "forward" else self.backward_stats
+        clock = time.perf_counter
+        record = self._record
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = original(*args, **kwargs)
+            record(stats, operation, category, start, clock())
+            return result
+        return timed
+
+    def _wrap_backward(self, original):
+        clock = time.perf_counter
+
+        def backward(root, *args, **kwargs):
+            # Measured before the call, which may release the graph
+            topo = root._topo or core._topological_order(root)
+            depth = core._graph_depth(topo)
+            start = clock()
+            result = original(root, *args, **kwargs)
+            end = clock()
+            self.backward_calls.append({
+                "nodes": len(topo), "depth": depth, "seconds": end - start,
+            })
+            if self.trace:
+                self.events.append({
+                    "name": "backward", "cat": "backward", "ph": "X", "pid": 0, "tid": 1,
+                    "ts": (start - self._start_time) * 1e6, "dur": (end - start) * 1e6,
+                    "args": {"nodes": len(topo)},
+                })
+            return result
+        return backward
+
+    def summary(self):
+        """
+        Return a text table of the collected statistics.
+
+        Returns:
+            str: Per-operation nodes, forward and backward calls/time, followed
+                 by one line per backward() call
+        """
+        operations = sorted(set(self.node_counts) | set(self.forward_stats) | set(self.backward_stats))
+        lines = [
+            f"{'operation':<10} {'nodes':>10} {'fwd calls':>10} {'fwd ms':>10} "
+            f"{'bwd calls':>10} {'bwd ms':>10}"
+        ]
+        for operation in operations:
+            forward_calls, forward_seconds = self.forward_stats.get(operation, (0, 0.0))
+            backward_calls, backward_seconds = self.backward_stats.get(operation, (0, 0.0))
+            lines.append(
+                f"{operation or '(leaf)':<10} {self.node_counts.get(operation, 0):>10} "
+                f"{forward_calls:>10} {forward_seconds * 1e3:>10.3f} "
+                f"{backward_calls:>10} {backward_seconds * 1e3:>10.3f}"
+            )
+        for i, call in enumerate(self.backward_calls):
+            lines.append(
+                f"backward #{i}: {call['nodes']} nodes, depth {call['depth']}, "
+                f"{call['seconds'] * 1e3:.3f} ms"
+            )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path):
+        """
+        Write the recorded events in Chrome trace format (chrome://tracing, Perfetto).
+
+        Requires the profiler to have been created with trace=True.
+
+        Args:
+            path: Destination JSON file path
+        """
+        if not self.trace:
+            raise RuntimeError("Create the Profiler with trace=True to export a trace")
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,168 @@
+"""
+Magnitude pruning of MLPs.
+
+After training, many weights of wide layers end up close to zero. prune()
+removes the weights with the smallest magnitudes and switches the affected
+layers to a sparse CSR layout (see Layer.prune): the scalar engine then
+builds linear nodes over the remaining connections only, and batched passes
+use a sparse matrix product, so both forward and backward skip the removed
+weights entirely.
+
+Weights can be selected by an absolute threshold, by keeping the top-k per
+neuron or per layer, or by a target sparsity. prune_and_retrain() alternates
+pruning and training on an increasing sparsity schedule, and sparsity_report()
+measures the speed of a model at several sparsity levels.
+"""
+
+import copy
+
+import numpy as np
+
+from profiler import best_time
+
+SCOPES = ("neuron", "layer")
+
+
+def prune(model, threshold=None, top_k=None, sparsity=None, scope="layer"):
+    """
+    Remove the smallest-magnitude weights of every layer, in place.
+
+    Exactly one of threshold, top_k and sparsity must be given. Biases are
+    never removed. Since the parameters change, create optimizers after
+    pruning.
+
+    Args:
+        model: The MLP to prune
+        threshold: Remove weights with an absolute value below threshold
+        top_k: Keep the top_k largest weights (by magnitude) per scope
+        sparsity: Fraction of all connections to remove per scope (including
+                  those already removed), e.g. 0.9 keeps 10%
+        scope: 'neuron' or 'layer': the group top_k and sparsity apply to
+
+    Returns:
+        float: The sparsity of the model afterwards (see model_sparsity)
+
+    Raises:
+        ValueError: If not exactly one criterion is given, or scope is unknown
+    """
+    if sum(criterion is not None for criterion in (threshold, top_k, sparsity)) != 1:
+        raise ValueError("Give exactly one of threshold, top_k and sparsity")
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope '{scope}', expected one of {SCOPES}")
+
+    for layer in model.layers:
+        # Magnitudes of all connections; removed connections count as -1 so
+        # they are never selected again
+        magnitudes = np.abs(layer._weight_array())
+        if layer.indptr is not None:
+            mask = np.zeros(magnitudes.shape, dtype=bool)
+            for j, neuron in enumerate(layer.neurons):
+                mask[neuron.indices, j] = True
+            magnitudes[~mask] = -1.0
+
+        if threshold is not None:
+            keep = magnitudes >= threshold
+        else:
+            group_size = layer.num_inputs if scope == "neuron" else magnitudes.size
+            k = top_k if top_k is not None else int(round((1.0 - sparsity) * group_size))
+            keep = _top_k_mask(magnitudes, min(k, group_size), per_column=scope == "neuron")
+        layer.prune(keep & (magnitudes >= 0))
+    return model_sparsity(model)
+
+
+def prune_and_retrain(model, train_fn, sparsities, scope="layer"):
+    """
+    Iteratively prune to increasing sparsity levels, retraining after each.
+
+    Args:
+        model: The MLP to prune
+        train_fn: Function train_fn(model) that fine-tunes the pruned model
+                  (creating its optimizer from model.parameters()) and returns
+                  a result to record, e.g. the validation loss
+        sparsities: Increasing target sparsities, e.g. [0.5, 0.75, 0.9]
+        scope: 'neuron' or 'layer' (see prune)
+
+    Returns:
+        List[dict]: One entry per step with the sparsity reached and the
+                    result of train_fn
+    """
+    history = []
+    for target in sparsities:
+        reached = prune(model, sparsity=target, scope=scope)
+        history.append({"sparsity": reached, "result": train_fn(model)})
+    return history
+
+
+def model_sparsity(model):
+    """
+    Fraction of the weights (not counting biases) that have been removed.
+
+    Args:
+        model: An MLP
+
+    Returns:
+        float: 0.0 for a dense model, 1.0 if every weight was removed
+    """
+    total = sum(layer.num_inputs * len(layer.neurons) for layer in model.layers)
+    remaining = sum(len(neuron.weights) for layer in model.layers for neuron in layer.neurons)
+    return 1.0 - remaining / total if total else 0.0
+
+
+def sparsity_report(model, inputs, targets, sparsities=(0.0, 0.5, 0.8, 0.9, 0.95), repeat=3):
+    """
+    Measure training and inference speed at several sparsity levels.
+
+    Each level is measured on a pruned copy of the model; the model itself is
+    not modified.
+
+    Args:
+        model: The (trained) MLP
+        inputs: 2-D batch of input rows
+        targets: Target for each row (single-output models)
+        sparsities: Sparsity levels to measure (0.0 measures the model as is)
+        repeat: Number of timing repetitions (the best one is reported)
+
+    Returns:
+        List[dict]: Per level: sparsity, remaining weights, and the time of
+                    one scalar forward+backward pass over all rows, one
+                    batched forward+backward pass, and one batched predict(),
+                    in milliseconds
+    """
+    inputs = np.asarray(inputs, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    rows = inputs.tolist()
+    report = []
+    for level in sparsities:
+        pruned = copy.deepcopy(model)
+        if level > 0:
+            prune(pruned, sparsity=level)
+
+        def scalar_step(_):
+            for x, y in zip(rows, targets.tolist()):
+                (pruned(x) - y).pow(2).backward()
+
+        def batch_step(_):
+            (pruned(inputs) - targets).pow(2).mean().backward()
+
+        report.append({
+            "sparsity": model_sparsity(pruned),
+            "weights": sum(len(neuron.weights) for layer in pruned.layers for neuron in layer.neurons),
+            "scalar_train_ms": best_time(scalar_step, repeat=repeat) * 1e3,
+            "batch_train_ms": best_time(batch_step, repeat=repeat) * 1e3,
+            "predict_ms": best_time(lambda _: pruned.predict(inputs), repeat=repeat) * 1e3,
+        })
+    return report
+
+
+def _top_k_mask(magnitudes, k, per_column):
+    """Boolean mask of the k largest magnitudes, per column or overall."""
+    keep = np.zeros(magnitudes.shape, dtype=bool)
+    if k <= 0:
+        return keep
+    if per_column:
+        rows = np.argsort(-magnitudes, axis=0, kind="stable")[:k]
+        np.put_along_axis(keep, rows, True, axis=0)
+    else:
+        flat = np.argsort(-magnitudes, axis=None, kind="stable")[:k]
+        keep.flat[flat] = True
+    return keep
@@ -0,0 +1,193 @@
+"""
+Post-training quantization of MLPs for inference.
+
+A trained MLP stores every parameter as a boxed 64-bit Value. quantize()
+packs it into per-layer NumPy arrays in a smaller format:
+
+- 'float32': weights and biases as float32 (half the size)
+- 'float16': weights as float16 (a quarter of the size), computed in float32
+- 'int8':    weights as int8 (an eighth of the size) with one symmetric scale
+             per layer. Layer inputs are quantized to int8 as well, with
+             per-layer scales calibrated on sample inputs, and the integer
+             products are accumulated exactly.
+
+NumPy has no fast low-precision matrix product, so the weights are widened
+to float32 once, when the model is created, and every prediction runs on
+float32 BLAS. For int8 this is still exact integer arithmetic as long as a
+layer's accumulated sums stay below 2**24, i.e. for up to 1040 inputs; wider
+layers are widened to int32 instead.
+
+Biases stay float32 in every format; they are a small fraction of the
+parameters. Use compare() to measure the accuracy lost against the float64
+model on held-out data.
+"""
+
+import numpy as np
+
+from checkpoint import ACTIVATIONS, FrozenMLP
+from neural_network import MLP
+
+DTYPES = ("float32", "float16", "int8")
+
+# Largest magnitude of a symmetric int8 value (-128 is not used)
+INT8_MAX = 127
+
+# Integers up to this magnitude are represented exactly in float32
+FLOAT32_EXACT_INT = 2 ** 24
+
+
+class QuantizedMLP:
+    """
+    An inference-only MLP with quantized, array-backed parameters.
+
+    Each layer is stored as (weights, bias, weight_scale, input_scale), with
+    weights of shape (num_inputs, num_outputs). The scales are only used by
+    the 'int8' format and are 1.0 otherwise. predict() runs on a widened
+    copy of the weights (see the module docstring), which is not counted in
+    nbytes.
+    """
+
+    def __init__(self, layer_sizes, activations, layers, dtype):
+        """
+        Initialize a quantized MLP (normally created by quantize()).
+
+        Args:
+            layer_sizes: List of layer sizes, e.g. [3, 4, 1]
+            activations: Activation name applied after each layer
+            layers: List of (weights, bias, weight_scale, input_scale) per layer
+            dtype: 'float32', 'float16' or 'int8'
+        """
+        self.layer_sizes = list(layer_sizes)
+        self.activations = list(activations)
+        self.layers = layers
+        self.dtype = dtype
+        self._kernels = [_widen(weights, dtype) for weights, _, _, _ in layers]
+
+    @property
+    def nbytes(self):
+        """Memory used by the parameter arrays, in bytes."""
+        return sum(weights.nbytes + bias.nbytes for weights, bias, _, _ in self.layers)
+
+    def predict(self, inputs):
+        """
+        Forward pass on plain arrays, computed in float32.
+
+        Args:
+            inputs: One sample (list of numbers) or a 2-D batch of rows
+
+        Returns:
+            float, np.ndarray: Same shapes as MLP.predict
+        """
+        x = np.asarray(inputs, dtype=np.float32)
+        single = x.ndim == 1
+        if single:
+            x = x[np.newaxis, :]
+        for (_, bias, weight_scale, input_scale), kernel, activation in zip(
+                self.layers, self._kernels, self.activations):
+            if self.dtype == "int8":
+                x_q = np.clip(np.rint(x / np.float32(input_scale)), -INT8_MAX, INT8_MAX).astype(kernel.dtype)
+                z = (x_q @ kernel).astype(np.float32, copy=False) * np.float32(input_scale * weight_scale)
+            else:
+                z = x @ kernel
+            x = ACTIVATIONS[activation](z + bias)
+        if x.shape[1] == 1:
+            x = x[:, 0]
+        if single:
+            return x[0].item() if x.ndim == 1 else x[0].tolist()
+        return x
+
+
+def quantize(model, dtype="float32", calibration_inputs=None):
+    """
+    Pack a trained model into a quantized, inference-only representation.
+
+    Args:
+        model: An MLP or FrozenMLP
+        dtype: 'float32', 'float16' or 'int8'
+        calibration_inputs: 2-D batch of representative inputs; required for
+                            'int8' to choose the per-layer input scales
+
+    Returns:
+        QuantizedMLP: The quantized model
+
+    Raises:
+        ValueError: If dtype is unknown, or 'int8' is requested without
+                    calibration inputs
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', expected one of {DTYPES}")
+    if dtype == "int8" and calibration_inputs is None:
+        raise ValueError("int8 quantization needs calibration_inputs")
+    frozen = FrozenMLP.from_model(model) if isinstance(model, MLP) else model
+
+    input_ranges = [1.0] * len(frozen.layers)
+    if dtype == "int8":
+        input_ranges = _calibrate(frozen, calibration_inputs)
+
+    layers = []
+    for (weights, bias), input_range in zip(frozen.layers, input_ranges):
+        bias = np.ascontiguousarray(bias, dtype=np.float32)
+        if dtype == "int8":
+            weight_scale = _scale(np.max(np.abs(weights)))
+            input_scale = _scale(input_range)
+            packed = np.rint(weights / weight_scale).astype(np.int8)
+            layers.append((packed, bias, weight_scale, input_scale))
+        else:
+            layers.append((np.ascontiguousarray(weights, dtype=dtype), bias, 1.0, 1.0))
+    return QuantizedMLP(frozen.layer_sizes, frozen.activations, layers, dtype)
+
+
+def compare(reference, quantized, inputs):
+    """
+    Report the accuracy and size of a quantized model against the original.
+
+    Args:
+        reference: The float64 model (MLP or FrozenMLP)
+        quantized: A QuantizedMLP
+        inputs: 2-D batch of evaluation inputs
+
+    Returns:
+        dict: max/mean absolute error, RMSE and relative RMSE of the outputs,
+              plus the parameter bytes of both models and the compression ratio
+    """
+    reference = FrozenMLP.from_model(reference) if isinstance(reference, MLP) else reference
+    inputs = np.asarray(inputs, dtype=float)
+    expected = np.asarray(reference.predict(inputs), dtype=float)
+    error = np.asarray(quantized.predict(inputs), dtype=float) - expected
+    rmse = float(np.sqrt(np.mean(error * error)))
+    scale = float(np.sqrt(np.mean(expected * expected)))
+    reference_bytes = np.asarray(reference.data).nbytes
+    return {
+        "dtype": quantized.dtype,
+        "max_abs_error": float(np.max(np.abs(error))),
+        "mean_abs_error": float(np.mean(np.abs(error))),
+        "rmse": rmse,
+        "relative_rmse": rmse / scale if scale else 0.0,
+        "reference_bytes": reference_bytes,
+        "quantized_bytes": quantized.nbytes,
+        "compression": reference_bytes / quantized.nbytes,
+    }
+
+
+def _calibrate(frozen, inputs):
+    """Largest absolute input seen by each layer on the calibration batch."""
+    x = np.asarray(inputs, dtype=float)
+    if x.ndim == 1:
+        x = x[np.newaxis, :]
+    ranges = []
+    for (weights, bias), activation in zip(frozen.layers, frozen.activations):
+        ranges.append(float(np.max(np.abs(x))))
+        x = ACTIVATIONS[activation](x @ weights + bias)
+    return ranges
+
+
+def _widen(weights, dtype):
+    """Weights in the type predict() multiplies with (see the module docstring)."""
+    if dtype == "int8" and weights.shape[0] * INT8_MAX ** 2 >= FLOAT32_EXACT_INT:
+        return weights.astype(np.int32)
+    return np.ascontiguousarray(weights, dtype=np.float32)
+
+
+def _scale(max_abs):
+    """Symmetric int8 scale mapping [-max_abs, max_abs] onto [-127, 127]."""
+    return float(max_abs) / INT8_MAX if max_abs > 0 else 1.0
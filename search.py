@@ -0,0 +1,320 @@
+"""
+Parallel hyperparameter search for MLP training.
+
+search() trains one MLP per trial configuration in a local process pool and
+ranks the trials by their best validation loss. Three strategies are
+available:
+
+- 'grid': every combination of the listed values
+- 'random': num_trials configurations sampled from the space
+- 'halving': successive halving: num_trials sampled configurations are
+  trained for a small number of epochs, the best 1/eta of them continue with
+  eta times the budget, and so on until the survivors reach epochs
+
+Within a trial, training stops early when the validation loss has not
+improved for `patience` epochs, or when it diverges. Every trial gets its own
+seed, used for the initial weights and the shuffling, so any trial can be
+reproduced from the results.
+
+A search space maps hyperparameter names to a list of values, or to a
+function rng -> value for sampling (see log_uniform). Supported names and
+their defaults are in DEFAULTS, e.g.:
+
+    space = {
+        "hidden_sizes": [(8,), (16,), (16, 16)],
+        "activation": ["tanh", "relu"],
+        "lr": log_uniform(1e-3, 1e-1),
+    }
+    results = search(space, X_train, y_train, X_val, y_val, strategy="random",
+                     num_trials=20, output="results.csv")
+"""
+
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from core import no_grad
+from losses import mse
+from neural_network import MLP
+from optim import SGD, Adam, RMSProp
+
+STRATEGIES = ("grid", "random", "halving")
+
+# Hyperparameters of a trial, with the values used when the space omits them
+DEFAULTS = {
+    "hidden_sizes": (16,),
+    "activation": "tanh",
+    "optimizer": "adam",
+    "lr": 0.01,
+    "batch_size": 32,
+}
+
+OPTIMIZERS = {"sgd": SGD, "rmsprop": RMSProp, "adam": Adam}
+
+
+def log_uniform(low, high):
+    """
+    Sampler for values spread evenly on a log scale (e.g. learning rates).
+
+    Args:
+        low: Smallest value
+        high: Largest value
+
+    Returns:
+        callable: Function rng -> value, usable in a search space
+    """
+    def sample(rng):
+        return math.exp(rng.uniform(math.log(low), math.log(high)))
+    return sample
+
+
+def search(space, X_train, y_train, X_val, y_val, strategy="random", num_trials=10, epochs=20,
+           patience=5, min_delta=0.0, eta=3, loss_fn=None, num_workers=None, seed=0, output=None):
+    """
+    Run a hyperparameter search.
+
+    Args:
+        space: Dict mapping hyperparameter names (see DEFAULTS) to a list of
+               values, or to a function rng -> value ('random' and 'halving')
+        X_train, y_train: Training inputs (2-D) and targets
+        X_val, y_val: Validation inputs and targets, used for ranking and
+                      early stopping
+        strategy: 'grid', 'random' or 'halving'
+        num_trials: Number of configurations to sample (ignored for 'grid')
+        epochs: Maximum number of training epochs per trial
+        patience: Stop a trial after this many epochs without improvement
+        min_delta: Smallest decrease of the validation loss that counts as
+                   an improvement
+        eta: Reduction factor of successive halving
+        loss_fn: Function (predictions, targets) -> mean loss; must be
+                 picklable. Defaults to losses.mse.
+        num_workers: Number of worker processes (defaults to the CPU count)
+        seed: Seed of the whole search; trial seeds are derived from it
+        output: Optional path of a .json or .csv file to write the results to
+
+    Returns:
+        List[dict]: One entry per trial, best validation loss first
+
+    Raises:
+        ValueError: If the strategy or a hyperparameter name is unknown, or a
+                    'grid' space contains a sampling function
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+    unknown = set(space) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters: {sorted(unknown)}")
+
+    rng = random.Random(seed)
+    if strategy == "grid":
+        configs = _grid(space)
+    else:
+        configs = [_sample(space, rng) for _ in range(num_trials)]
+    trials = [
+        {"trial": i, "seed": rng.getrandbits(32), "config": config}
+        for i, config in enumerate(configs)
+    ]
+
+    data = tuple(np.asarray(a, dtype=float) for a in (X_train, y_train, X_val, y_val))
+    stopping = (patience, min_delta)
+    with ProcessPoolExecutor(max_workers=num_workers or os.cpu_count() or 1, initializer=_init_worker,
+                             initargs=(data, loss_fn or mse, stopping)) as pool:
+        if strategy == "halving":
+            results = _successive_halving(pool, trials, epochs, eta)
+        else:
+            results = _run_all(pool, trials, epochs)
+
+    results.sort(key=lambda result: result["best_val_loss"])
+    if output is not None:
+        write_results(results, output)
+    return results
+
+
+def write_results(results, path):
+    """
+    Write search results to a JSON or CSV file (chosen by the extension).
+
+    The CSV file has one column per hyperparameter and omits the loss curves.
+    Non-finite losses (e.g. of a trial that diverged in its first epoch) are
+    written as null in JSON and as empty cells in CSV.
+
+    Args:
+        results: List of trial results returned by search()
+        path: Destination path ending in .json or .csv
+
+    Raises:
+        ValueError: If the extension is neither .json nor .csv
+    """
+    extension = os.path.splitext(path)[1].lower()
+    results = [
+        {**result, **{key: _finite(result[key]) for key in ("best_val_loss", "final_val_loss")},
+         "curve": [_finite(loss) for loss in result["curve"]]}
+        for result in results
+    ]
+    if extension == ".json":
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, allow_nan=False)
+    elif extension == ".csv":
+        names = sorted({name for result in results for name in result["config"]})
+        columns = ["trial", "seed", *names, "status", "epochs", "best_epoch", "best_val_loss",
+                   "final_val_loss", "seconds"]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            for result in results:
+                writer.writerow({**result, **{name: json.dumps(value) if isinstance(value, list) else value
+                                              for name, value in result["config"].items()}})
+    else:
+        raise ValueError(f"Unsupported results format '{extension}', expected .json or .csv")
+
+
+def _finite(loss):
+    """The loss, or None if it is inf or nan (which JSON cannot represent)."""
+    return loss if math.isfinite(loss) else None
+
+
+def _grid(space):
+    """All combinations of the listed values, in a stable order."""
+    names = sorted(space)
+    for name in names:
+        if callable(space[name]):
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def _sample(space, rng):
+    """Draw one configuration: a random choice from lists, or call samplers."""
+    return {
+        name: values(rng) if callable(values) else rng.choice(list(values))
+        for name, values in sorted(space.items())
+    }
+
+
+def _run_all(pool, trials, epochs):
+    """Train every trial for up to epochs; return their results."""
+    futures = [pool.submit(_worker_train, _new_state(trial), epochs) for trial in trials]
+    return [_result(future.result()) for future in as_completed(futures)]
+
+
+def _successive_halving(pool, trials, epochs, eta):
+    """
+    Successive halving over the trials.
+
+    With n trials there are about log_eta(n) + 1 rungs. The first rung trains
+    every trial for epochs / eta^(rungs - 1) epochs. Each later rung keeps
+    the best 1/eta of the trials still running and continues their training
+    (from where it stopped) up to eta times the previous budget.
+    """
+    # floor(log_eta(n)) + 1, counted with integers (math.log(243, 3) < 5)
+    rungs = 1
+    while eta ** rungs <= len(trials):
+        rungs += 1
+    states = [_new_state(trial) for trial in trials]
+    finished = []
+    for rung in range(rungs):
+        budget = max(1, round(epochs / eta ** (rungs - 1 - rung)))
+        futures = [pool.submit(_worker_train, state, budget - state["epochs"]) for state in states]
+        states = [future.result() for future in as_completed(futures)]
+        states.sort(key=lambda state: state["best_val_loss"])
+
+        # Trials stopped early do not compete for the next rung
+        running = [state for state in states if state["status"] == "running"]
+        finished.extend(state for state in states if state["status"] != "running")
+        if rung == rungs - 1:
+            finished.extend(running)
+            break
+        keep = max(1, len(running) // eta)
+        for state in running[keep:]:
+            state["status"] = "halved"
+        finished.extend(running[keep:])
+        states = running[:keep]
+        if not states:
+            break
+
+    results = []
+    for state in finished:
+        if state["status"] == "running":
+            state["status"] = "completed"
+        results.append(_result(state))
+    return results
+
+
+def _new_state(trial):
+    """Initial state of a trial; the model is created in the worker."""
+    return {**trial, "model": None, "optimizer": None, "shuffle": None, "curve": [], "epochs": 0,
+            "best_val_loss": math.inf, "best_epoch": None, "status": "running", "seconds": 0.0}
+
+
+def _result(state):
+    """The picklable, serializable summary of a trial state."""
+    config = {name: list(value) if isinstance(value, tuple) else value for name, value in state["config"].items()}
+    return {
+        "trial": state["trial"],
+        "seed": state["seed"],
+        "config": config,
+        "status": "completed" if state["status"] == "running" else state["status"],
+        "epochs": state["epochs"],
+        "best_epoch": state["best_epoch"],
+        "best_val_loss": state["best_val_loss"],
+        "final_val_loss": state["curve"][-1] if state["curve"] else math.inf,
+        "seconds": state["seconds"],
+        "curve": state["curve"],
+    }
+
+
+# State of a worker process, set up once by _init_worker
+_worker_state = {}
+
+
+def _init_worker(data, loss_fn, stopping):
+    _worker_state.update(data=data, loss_fn=loss_fn, stopping=stopping)
+
+
+def _worker_train(state, epochs):
+    """Train a trial for up to epochs more epochs; return its updated state."""
+    X_train, y_train, X_val, y_val = _worker_state["data"]
+    loss_fn = _worker_state["loss_fn"]
+    patience, min_delta = _worker_state["stopping"]
+    config = {**DEFAULTS, **state["config"]}
+    start = time.perf_counter()
+
+    if state["model"] is None:
+        num_outputs = 1 if y_train.ndim == 1 else y_train.shape[1]
+        layer_sizes = [X_train.shape[1], *config["hidden_sizes"], num_outputs]
+        model = MLP(layer_sizes, activation=config["activation"], rng=random.Random(state["seed"]))
+        state["model"] = model
+        state["optimizer"] = OPTIMIZERS[config["optimizer"]](model.parameters(), lr=config["lr"])
+        state["shuffle"] = np.random.default_rng(state["seed"])
+    model, optimizer = state["model"], state["optimizer"]
+    batch_size = config["batch_size"]
+
+    for _ in range(epochs):
+        order = state["shuffle"].permutation(len(X_train))
+        for begin in range(0, len(order), batch_size):
+            batch = order[begin:begin + batch_size]
+            optimizer.zero_grad()
+            loss_fn(model(X_train[batch]), y_train[batch]).backward()
+            optimizer.step()
+
+        with no_grad():
+            val_loss = float(loss_fn(model(X_val), y_val).value)
+        state["epochs"] += 1
+        state["curve"].append(val_loss)
+        if not math.isfinite(val_loss):
+            state["status"] = "diverged"
+            break
+        if val_loss < state["best_val_loss"] - min_delta:
+            state["best_val_loss"], state["best_epoch"] = val_loss, state["epochs"]
+        elif state["epochs"] - state["best_epoch"] >= patience:
+            state["status"] = "early_stopped"
+            break
+
+    state["seconds"] += time.perf_counter() - start
+    return state
@@ -0,0 +1,250 @@
+"""
+Local inference server with dynamic micro-batching.
+
+Requests are queued for at most a few milliseconds and then answered together
+with one batched, gradient-free forward pass on a thread pool, so the cost of
+the forward pass is shared by every request in the batch. The server speaks
+newline-delimited JSON over TCP and needs no external services:
+
+    request:  {"id": 1, "inputs": [0.5, 1.2]}
+    response: {"id": 1, "output": 0.83}
+
+    request:  {"command": "stats"}
+    response: {"requests": ..., "batches": ..., "queue_depth": ..., "latency_ms": {...}}
+
+Usage:
+    python serving.py model.ckpt --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from checkpoint import FrozenMLP
+from neural_network import MLP
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction requests into batches.
+
+    A batch is closed when it reaches max_batch_size or when max_delay seconds
+    have passed since its first request. Batches run on a thread pool (NumPy
+    releases the GIL during the matrix products), so several batches can be in
+    flight while new requests keep arriving.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_delay=0.002, num_threads=None, history=10000):
+        """
+        Initialize the batcher.
+
+        Args:
+            model: A FrozenMLP, or an MLP (frozen with its current parameters)
+            max_batch_size: Maximum number of requests per batch
+            max_delay: Maximum time in seconds a request waits for its batch to fill
+            num_threads: Size of the thread pool running the forward passes
+            history: Number of recent request latencies kept for percentiles
+        """
+        self.model = FrozenMLP.from_model(model) if isinstance(model, MLP) else model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.latencies = deque(maxlen=history)
+        self.requests = 0
+        self.batches = 0
+        self._executor = ThreadPoolExecutor(num_threads)
+        self._queue = None
+        self._task = None
+        self._batch_tasks = set()  # asyncio only keeps weak references to tasks
+
+    async def start(self):
+        """Start collecting batches (must be called from the running event loop)."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """
+        Stop collecting batches and shut down the thread pool.
+
+        Batches already running are completed; requests still waiting in the
+        queue, or collected into a batch that has not started, are cancelled.
+        """
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        self._executor.shutdown()
+
+    @property
+    def queue_depth(self):
+        """Number of requests waiting to be put into a batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def predict(self, inputs):
+        """
+        Predict one sample; waits until its batch has been computed.
+
+        Args:
+            inputs: List of input values
+
+        Returns:
+            float or List[float]: The model output for this sample
+
+        Raises:
+            ValueError: If inputs is not a flat list of layer_sizes[0] numbers
+        """
+        # Checked here, so a malformed request fails alone instead of
+        # failing the whole batch it would have joined
+        inputs = np.asarray(inputs, dtype=float)
+        num_inputs = self.model.layer_sizes[0]
+        if inputs.shape != (num_inputs,):
+            raise ValueError(f"Expected a list of {num_inputs} inputs, got shape {inputs.shape}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            try:
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Stopped while filling a batch: its requests will never run
+                for _, future, _ in batch:
+                    future.cancel()
+                raise
+            task = loop.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            inputs = np.stack([inputs for inputs, _, _ in batch])
+            outputs = await loop.run_in_executor(self._executor, self.model.predict, inputs)
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        end = time.perf_counter()
+        for (_, future, start), output in zip(batch, outputs):
+            self.latencies.append(end - start)
+            if not future.done():
+                future.set_result(output.tolist())
+
+    def stats(self):
+        """
+        Return serving statistics.
+
+        Returns:
+            dict: Request and batch counts, mean batch size, current queue
+                  depth and latency percentiles (ms) over recent requests
+        """
+        latencies = np.array(self.latencies) * 1e3
+        percentiles = (
+            dict(zip(("p50", "p90", "p99"), np.percentile(latencies, [50, 90, 99]).tolist()))
+            if len(latencies) else {}
+        )
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue_depth,
+            "latency_ms": percentiles,
+        }
+
+
+async def serve(model, host="127.0.0.1", port=8765, **batcher_options):
+    """
+    Serve predictions over TCP until cancelled.
+
+    Each line received is handled as its own task, so a client may pipeline
+    requests on one connection; responses carry the request id and may arrive
+    out of order.
+
+    Args:
+        model: A FrozenMLP or MLP
+        host: Interface to listen on
+        port: TCP port
+        **batcher_options: Passed to MicroBatcher
+    """
+    batcher = MicroBatcher(model, **batcher_options)
+    await batcher.start()
+
+    async def handle_connection(reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+                if request.get("command") == "stats":
+                    response = batcher.stats()
+                else:
+                    response = {"id": request.get("id"), "output": await batcher.predict(request["inputs"])}
+            except Exception as error:
+                response = {"error": str(error)}
+            async with write_lock:
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        while line := await reader.readline():
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve an MLP checkpoint with micro-batching")
+    parser.add_argument("checkpoint", help="Checkpoint written by MLP.save")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    model = FrozenMLP.load(args.checkpoint)
+    print(f"Serving {args.checkpoint} on {args.host}:{args.port}")
+    try:
+        asyncio.run(serve(model, args.host, args.port, max_batch_size=args.max_batch_size,
+                          max_delay=args.max_delay_ms / 1e3, num_threads=args.threads))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Sparse input rows for high-dimensional, mostly-zero features.
+
+One-hot categorical and hashed text features have thousands of dimensions but
+only a handful of nonzero entries per sample. MLP and Layer accept such inputs
+directly, and then only compute over (and backpropagate into the weights of)
+the nonzero entries:
+
+- a single sample as a dict {feature index: value}
+- a batch as SparseRows, a CSR matrix of samples
+
+Example:
+    model = MLP([100000, 16, 1])
+    prediction = model({17: 1.0, 52341: 0.5})
+    batch = SparseRows.from_pairs([[(17, 1.0)], [(3, 2.0), (99999, 1.0)]], 100000)
+    predictions = model(batch)
+"""
+
+import numpy as np
+
+
+class SparseRows:
+    """
+    A batch of sparse rows in CSR layout.
+
+    Row b has the nonzero values values[indptr[b]:indptr[b + 1]] at the
+    feature positions indices[indptr[b]:indptr[b + 1]].
+    """
+
+    ndim = 2
+
+    def __init__(self, indptr, indices, values, num_features):
+        """
+        Initialize a sparse batch.
+
+        Args:
+            indptr: Integer array of shape (batch + 1,)
+            indices: Integer array of shape (nnz,) with feature positions
+            values: Array of shape (nnz,) with the nonzero values
+            num_features: Width of the dense rows
+        """
+        self.indptr = np.asarray(indptr, dtype=int)
+        self.indices = np.asarray(indices, dtype=int)
+        self.values = np.asarray(values, dtype=float)
+        self.num_features = num_features
+
+    @classmethod
+    def from_pairs(cls, rows, num_features):
+        """
+        Build a batch from (index, value) pairs.
+
+        Args:
+            rows: One entry per sample: an iterable of (index, value) pairs,
+                  or a dict {index: value}
+            num_features: Width of the dense rows
+
+        Returns:
+            SparseRows: The batch
+        """
+        indptr, indices, values = [0], [], []
+        for row in rows:
+            pairs = row.items() if isinstance(row, dict) else row
+            for index, value in pairs:
+                indices.append(index)
+                values.append(value)
+            indptr.append(len(indices))
+        return cls(indptr, indices, values, num_features)
+
+    @classmethod
+    def from_dense(cls, array):
+        """
+        Build a batch from the nonzero entries of a dense 2-D array.
+
+        Args:
+            array: 2-D array-like of shape (batch, num_features)
+
+        Returns:
+            SparseRows: The batch
+        """
+        array = np.asarray(array, dtype=float)
+        rows, indices = np.nonzero(array)
+        indptr = np.searchsorted(rows, np.arange(array.shape[0] + 1))
+        return cls(indptr, indices, array[rows, indices], array.shape[1])
+
+    @property
+    def shape(self):
+        """(batch, num_features), as for a dense batch."""
+        return (len(self.indptr) - 1, self.num_features)
+
+    @property
+    def nnz(self):
+        """Number of stored (nonzero) entries."""
+        return len(self.values)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def row(self, b):
+        """
+        Return one row as a dict {index: value} (a sparse single sample).
+
+        Args:
+            b: Row number
+
+        Returns:
+            dict: The nonzero entries of the row
+        """
+        start, end = self.indptr[b], self.indptr[b + 1]
+        return dict(zip(self.indices[start:end].tolist(), self.values[start:end].tolist()))
+
+    def to_dense(self):
+        """Return the batch as a dense (batch, num_features) array."""
+        dense = np.zeros(self.shape)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        np.add.at(dense, (rows, self.indices), self.values)
+        return dense
+
+    def compact(self):
+        """
+        Renumber the features to the ones the batch actually uses.
+
+        Returns:
+            tuple: (sorted array of the distinct feature positions used,
+                    indices renumbered into positions of that array)
+        """
+        return np.unique(self.indices, return_inverse=True)
@@ -0,0 +1,555 @@
+"""
+Tensor class for vectorized automatic differentiation.
+
+This module contains the Tensor class, the array counterpart of Value.
+A Tensor node stores a NumPy array and its gradient, so the computation of a
+whole layer becomes a handful of graph nodes instead of one node per scalar.
+"""
+
+import numpy as np
+
+from core import _topological_order, is_grad_enabled
+
+
+class Tensor:
+    """
+    A node in a computational graph that stores an array and its gradient.
+
+    Tensor supports the same operations as Value (plus matmul, sum, mean and
+    reshape) with NumPy broadcasting, and follows the same contract: build an
+    expression, call backward() on the result, read each node's gradient.
+    """
+
+    def __init__(self, value, children=(), operation='', label='', requires_grad=True):
+        """
+        Initialize a Tensor node.
+
+        Args:
+            value: The array (or anything np.asarray accepts)
+            children: Tuple of Tensor objects that this node depends on
+            operation: String describing the operation that created this node
+            label: Optional label for visualization
+            requires_grad: For leaves, whether backward() computes a gradient
+                           for this node (False for data and constants, see
+                           _as_tensor). A computed node requires a gradient if
+                           any of its children does.
+        """
+        self.value = np.asarray(value, dtype=float)  # The actual numerical array
+        if is_grad_enabled():
+            self.children = tuple(children)  # Previous nodes in the computation
+            self.operation = operation  # The operation that created this node
+            if self.children:
+                requires_grad = any(child.requires_grad for child in self.children)
+            # Gradient for backpropagation. Only leaves that require a
+            # gradient get an array up front (they accumulate into it); other
+            # nodes start at 0.0 and get an array when backward() reaches them
+            self.gradient = np.zeros_like(self.value) if requires_grad and not self.children else 0.0
+        else:
+            # Inside no_grad(): keep no references to the graph and allocate
+            # no gradient. Results of operations are not trainable leaves
+            self.children = ()
+            self.operation = ''
+            if children:
+                requires_grad = False
+            self.gradient = 0.0
+        self.requires_grad = requires_grad
+        self.label = label  # Optional label for visualization
+        self._context = None  # Extra data the backward rule needs (axis, exponent, ...)
+        self._topo = None  # Cached topological order (set by backward)
+        self._sources = None  # Value parameters backing this leaf (see parameter_tensor)
+
+    def __repr__(self):
+        return f"Tensor(value={self.value}, label={self.label})"
+
+    @property
+    def shape(self):
+        """Shape of the underlying array."""
+        return self.value.shape
+
+    @property
+    def ndim(self):
+        """Number of dimensions of the underlying array."""
+        return self.value.ndim
+
+    def __add__(self, other):
+        """Addition operation with broadcasting."""
+        other_value = _as_tensor(other)
+        return Tensor(
+            value=self.value + other_value.value,
+            children=(self, other_value),
+            operation="+"
+        )
+
+    def __radd__(self, other):
+        return self + other
+
+    def __mul__(self, other):
+        """Multiplication operation with broadcasting."""
+        other_value = _as_tensor(other)
+        return Tensor(
+            value=self.value * other_value.value,
+            children=(self, other_value),
+            operation="*"
+        )
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __sub__(self, other):
+        """Subtraction operation with broadcasting."""
+        other_value = _as_tensor(other)
+        return Tensor(
+            value=self.value - other_value.value,
+            children=(self, other_value),
+            operation="-"
+        )
+
+    def __rsub__(self, other):
+        return _as_tensor(other) - self
+
+    def __truediv__(self, other):
+        """Division operation with broadcasting."""
+        other_value = _as_tensor(other)
+        return Tensor(
+            value=self.value / other_value.value,
+            children=(self, other_value),
+            operation="/"
+        )
+
+    def __rtruediv__(self, other):
+        return _as_tensor(other) / self
+
+    def __neg__(self):
+        return self * -1.0
+
+    def __matmul__(self, other):
+        """Matrix multiplication (same semantics as np.matmul)."""
+        other_value = _as_tensor(other)
+        return Tensor(
+            value=self.value @ other_value.value,
+            children=(self, other_value),
+            operation="matmul"
+        )
+
+    def __rmatmul__(self, other):
+        return _as_tensor(other) @ self
+
+    def pow(self, exponent):
+        """Power operation: self^exponent for a scalar exponent."""
+        result = Tensor(
+            value=self.value ** exponent,
+            children=(self,),
+            operation="pow"
+        )
+        result._context = exponent
+        return result
+
+    def exp(self):
+        """Elementwise exponential function: e^self."""
+        return Tensor(
+            value=np.exp(self.value),
+            children=(self,),
+            operation="exp"
+        )
+
+    def log(self):
+        """Elementwise natural logarithm: ln(self)."""
+        return Tensor(
+            value=np.log(self.value),
+            children=(self,),
+            operation="log"
+        )
+
+    def tanh(self):
+        """Elementwise hyperbolic tangent activation function."""
+        return Tensor(
+            value=np.tanh(self.value),
+            children=(self,),
+            operation="tanh"
+        )
+
+    def relu(self):
+        """Elementwise Rectified Linear Unit activation function."""
+        return Tensor(
+            value=np.maximum(self.value, 0.0),
+            children=(self,),
+            operation="relu"
+        )
+
+    def sum(self, axis=None, keepdims=False):
+        """Sum of elements over the given axis (all elements by default)."""
+        result = Tensor(
+            value=self.value.sum(axis=axis, keepdims=keepdims),
+            children=(self,),
+            operation="sum"
+        )
+        result._context = (axis, keepdims)
+        return result
+
+    def mean(self, axis=None, keepdims=False):
+        """Mean of elements over the given axis (all elements by default)."""
+        result = Tensor(
+            value=self.value.mean(axis=axis, keepdims=keepdims),
+            children=(self,),
+            operation="mean"
+        )
+        result._context = (axis, keepdims)
+        return result
+
+    def reshape(self, *shape):
+        """Return the same data with a new shape."""
+        return Tensor(
+            value=self.value.reshape(*shape),
+            children=(self,),
+            operation="reshape"
+        )
+
+    def backward(self, retain_graph=False):
+        """
+        Compute gradients of this tensor with respect to every node in its graph.
+
+        The output gradient is initialized to ones (the gradient of sum(self)),
+        so calling backward() on a scalar loss behaves exactly like Value.backward.
+        As there, nodes that do not require a gradient (data, constants and
+        subtrees built only from them) are skipped, gradients accumulate into
+        the leaves (including the Value parameters behind parameter_tensor
+        leaves) across calls, and the graph is released while backpropagating
+        unless retain_graph is True.
+
+        Args:
+            retain_graph: Keep the graph (and the arrays saved by the forward
+                          pass) after backward()
+
+        Raises:
+            RuntimeError: If the graph, or a part of it shared with another
+                          output, was released by an earlier backward()
+        """
+        topo = self._topo
+        if topo is None:
+            topo = _topological_order(self)
+        self._topo = topo if retain_graph else None
+
+        # Only leaves accumulate gradients across calls; parameter tensors are
+        # reset too, since their gradient is added into the Values each time.
+        # A node with an operation but no children was released earlier (only
+        # nodes that require a gradient are ever released).
+        for node in topo:
+            if node.children or node._sources is not None:
+                node.gradient = 0.0
+            elif node.operation and node.requires_grad:
+                raise RuntimeError(
+                    "The graph was released by a previous backward(); "
+                    "pass retain_graph=True to backpropagate through it again"
+                )
+
+        # Initialize gradient of output node
+        self.gradient = np.ones_like(self.value)
+
+        # Backpropagate through the graph, releasing it unless retain_graph.
+        # Subtrees built only from data and constants are kept, so other
+        # outputs that share them can still backpropagate
+        rules = _BACKWARD_RULES
+        for node in reversed(topo):
+            if node.operation and node.requires_grad:
+                rules[node.operation](node)
+            elif node._sources is not None:
+                _scatter_gradient(node)
+            if not retain_graph and node.requires_grad:
+                node.children = ()
+                node._context = None
+                node._topo = None
+
+    def zero_grad(self):
+        """Reset all gradients in the graph to zero."""
+        topo = self._topo
+        if topo is None:
+            topo = _topological_order(self)
+        for node in topo:
+            node.gradient = np.zeros_like(node.value)
+
+
+def parameter_tensor(values, shape=None):
+    """
+    Pack Value parameters into a leaf Tensor that feeds gradients back to them.
+
+    The Tensor holds a copy of the parameters' current values. After backward()
+    its gradient is added into each Value's gradient, so a batched pass fills
+    the same parameter gradients as the scalar engine.
+
+    Args:
+        values: Flat list of Value objects (row-major order for the given shape)
+        shape: Optional shape of the Tensor (defaults to a 1-D vector)
+
+    Returns:
+        Tensor: Leaf tensor linked to the given Value objects
+    """
+    array = np.fromiter((v.value for v in values), dtype=float, count=len(values))
+    tensor = Tensor(array.reshape(shape) if shape is not None else array)
+    tensor._sources = values
+    return tensor
+
+
+def sparse_matmul(inputs, weights, indptr, indices):
+    """
+    Multiply a batch by a sparse weight matrix stored in CSR layout.
+
+    Output column r is the sum over k in indptr[r]:indptr[r + 1] of
+    weights[k] * inputs[:, indices[k]]. The result equals inputs @ W for the
+    dense (num_inputs, num_outputs) matrix W holding the stored weights, but
+    the forward and backward passes only touch the stored weights.
+
+    Args:
+        inputs: Tensor (or array) of shape (batch, num_inputs)
+        weights: Tensor of shape (nnz,) with the stored weights
+        indptr: Integer array of shape (num_outputs + 1,): the weights of
+                output r are weights[indptr[r]:indptr[r + 1]]
+        indices: Integer array of shape (nnz,): the input each weight reads
+
+    Returns:
+        Tensor: Result of shape (batch, num_outputs)
+    """
+    inputs = _as_tensor(inputs)
+    result = Tensor(
+        value=_csr_matmul(inputs.value, weights.value, indptr, indices),
+        children=(inputs, weights),
+        operation="sparse_matmul"
+    )
+    result._context = (indptr, indices)
+    return result
+
+
+def sparse_input_matmul(indptr, indices, values, weights):
+    """
+    Multiply a constant sparse batch (CSR rows) by a weight matrix.
+
+    Row b of the result is the sum over k in indptr[b]:indptr[b + 1] of
+    values[k] * weights[indices[k]], so the cost scales with the number of
+    stored entries, and only the weight rows that are read get a gradient.
+
+    Args:
+        indptr: Integer array of shape (batch + 1,)
+        indices: Integer array of shape (nnz,): the weight row each entry reads
+        values: Array of shape (nnz,) with the stored entries
+        weights: Tensor of shape (num_rows, num_outputs)
+
+    Returns:
+        Tensor: Result of shape (batch, num_outputs)
+    """
+    result = Tensor(
+        value=_sparse_rows_matmul(indptr, indices, values, weights.value),
+        children=(weights,),
+        operation="sparse_input_matmul"
+    )
+    result._context = (indptr, indices, values)
+    return result
+
+
+def _sparse_rows_matmul(indptr, indices, values, weights):
+    """X @ weights for a CSR batch X given by (indptr, indices, values), on arrays."""
+    out = np.zeros((len(indptr) - 1, weights.shape[1]))
+    starts = indptr[:-1]
+    nonempty = starts < indptr[1:]
+    if nonempty.any():
+        out[nonempty] = np.add.reduceat(values[:, np.newaxis] * weights[indices], starts[nonempty], axis=0)
+    return out
+
+
+def _csr_matmul(x, data, indptr, indices):
+    """x @ W for a CSR matrix W given by (data, indptr, indices), on arrays."""
+    out = np.zeros((x.shape[0], len(indptr) - 1))
+    starts = indptr[:-1]
+    nonempty = starts < indptr[1:]
+    if nonempty.any():
+        # reduceat sums each run between consecutive starts; empty rows are
+        # left out so that every run is exactly one row
+        out[:, nonempty] = np.add.reduceat(x[:, indices] * data, starts[nonempty], axis=1)
+    return out
+
+
+def _scatter_gradient(node):
+    """Add a parameter tensor's gradient into the Value objects backing it."""
+    for value, gradient in zip(node._sources, node.gradient.ravel().tolist()):
+        value.gradient += gradient
+
+
+def _as_tensor(value):
+    """Wrap numbers and arrays in a constant Tensor; pass Tensors through."""
+    return value if isinstance(value, Tensor) else Tensor(value, requires_grad=False)
+
+
+def _unbroadcast(gradient, shape):
+    """
+    Sum a broadcast gradient back down to the shape of the operand.
+
+    Args:
+        gradient: Gradient with the (broadcast) shape of the result
+        shape: Shape of the operand the gradient flows into
+
+    Returns:
+        np.ndarray: Gradient with the given shape
+    """
+    while gradient.ndim > len(shape):
+        gradient = gradient.sum(axis=0)
+    for axis, size in enumerate(shape):
+        if size == 1 and gradient.shape[axis] != 1:
+            gradient = gradient.sum(axis=axis, keepdims=True)
+    return gradient
+
+
+def _expand_reduced(gradient, context, shape):
+    """Broadcast the gradient of a sum/mean back to the input shape."""
+    axis, keepdims = context
+    if axis is not None and not keepdims:
+        gradient = np.expand_dims(gradient, axis)
+    return np.broadcast_to(gradient, shape)
+
+
+# Backward rules: each one propagates node.gradient into node's children.
+
+# Binary rules only compute the gradient of children that require one; a
+# unary node requires a gradient exactly when its child does.
+
+def _backward_add(node):
+    for child in node.children:
+        if child.requires_grad:
+            child.gradient = child.gradient + _unbroadcast(node.gradient, child.shape)
+
+
+def _backward_sub(node):
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient = a.gradient + _unbroadcast(node.gradient, a.shape)
+    if b.requires_grad:
+        b.gradient = b.gradient - _unbroadcast(node.gradient, b.shape)
+
+
+def _backward_mul(node):
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient = a.gradient + _unbroadcast(b.value * node.gradient, a.shape)
+    if b.requires_grad:
+        b.gradient = b.gradient + _unbroadcast(a.value * node.gradient, b.shape)
+
+
+def _backward_div(node):
+    a, b = node.children
+    if a.requires_grad:
+        a.gradient = a.gradient + _unbroadcast(node.gradient / b.value, a.shape)
+    if b.requires_grad:
+        b.gradient = b.gradient - _unbroadcast(node.value * node.gradient / b.value, b.shape)
+
+
+def _backward_matmul(node):
+    a, b = node.children
+    g = node.gradient
+    if a.requires_grad:
+        if a.ndim == 1 and b.ndim == 1:
+            grad_a = g * b.value
+        elif a.ndim == 1:
+            grad_a = b.value @ g
+        elif b.ndim == 1:
+            grad_a = np.outer(g, b.value)
+        else:
+            grad_a = g @ np.swapaxes(b.value, -1, -2)
+        a.gradient = a.gradient + _unbroadcast(grad_a, a.shape)
+    if b.requires_grad:
+        if a.ndim == 1 and b.ndim == 1:
+            grad_b = g * a.value
+        elif a.ndim == 1:
+            grad_b = np.outer(a.value, g)
+        elif b.ndim == 1:
+            grad_b = a.value.T @ g
+        else:
+            grad_b = np.swapaxes(a.value, -1, -2) @ g
+        b.gradient = b.gradient + _unbroadcast(grad_b, b.shape)
+
+
+def _backward_sparse_matmul(node):
+    inputs, weights = node.children
+    indptr, indices = node._context
+    # Gradient of the output each stored weight contributes to
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    upstream = node.gradient[:, rows]
+    if weights.requires_grad:
+        weights.gradient = weights.gradient + np.einsum("bk,bk->k", upstream, inputs.value[:, indices])
+    if not inputs.requires_grad:
+        return
+
+    # Sum the contributions to each input column, grouped by column (CSC order)
+    order = np.argsort(indices, kind="stable")
+    columns = indices[order]
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]]) if len(columns) else columns
+    grad_inputs = np.zeros_like(inputs.value)
+    if len(columns):
+        grad_inputs[:, columns[starts]] = np.add.reduceat((upstream * weights.value)[:, order], starts, axis=1)
+    inputs.gradient = inputs.gradient + grad_inputs
+
+
+def _backward_sparse_input_matmul(node):
+    (weights,) = node.children
+    indptr, indices, values = node._context
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    grad_weights = np.zeros_like(weights.value)
+    np.add.at(grad_weights, indices, values[:, np.newaxis] * node.gradient[rows])
+    weights.gradient = weights.gradient + grad_weights
+
+
+def _backward_pow(node):
+    (child,) = node.children
+    exponent = node._context
+    child.gradient = child.gradient + exponent * child.value ** (exponent - 1) * node.gradient
+
+
+def _backward_exp(node):
+    (child,) = node.children
+    child.gradient = child.gradient + node.value * node.gradient
+
+
+def _backward_log(node):
+    (child,) = node.children
+    child.gradient = child.gradient + node.gradient / child.value
+
+
+def _backward_tanh(node):
+    (child,) = node.children
+    child.gradient = child.gradient + (1 - node.value**2) * node.gradient
+
+
+def _backward_relu(node):
+    (child,) = node.children
+    child.gradient = child.gradient + (child.value > 0) * node.gradient
+
+
+def _backward_sum(node):
+    (child,) = node.children
+    child.gradient = child.gradient + _expand_reduced(node.gradient, node._context, child.shape)
+
+
+def _backward_mean(node):
+    (child,) = node.children
+    count = child.value.size // max(node.value.size, 1)
+    child.gradient = child.gradient + _expand_reduced(node.gradient, node._context, child.shape) / count
+
+
+def _backward_reshape(node):
+    (child,) = node.children
+    child.gradient = child.gradient + node.gradient.reshape(child.shape)
+
+
+_BACKWARD_RULES = {
+    "+": _backward_add,
+    "-": _backward_sub,
+    "*": _backward_mul,
+    "/": _backward_div,
+    "matmul": _backward_matmul,
+    "sparse_matmul": _backward_sparse_matmul,
+    "sparse_input_matmul": _backward_sparse_input_matmul,
+    "pow": _backward_pow,
+    "exp": _backward_exp,
+    "log": _backward_log,
+    "tanh": _backward_tanh,
+    "relu": _backward_relu,
+    "sum": _backward_sum,
+    "mean": _backward_mean,
+    "reshape": _backward_reshape,
+}
@@ -5,42 +5,59 @@ This module provides functions to visualize the computational graphs
 created during neural network forward and backward passes.
 """
 
+import math
+from collections import deque
+
 from graphviz import Digraph
 from core import Value
 
 
-def trace_computational_graph(root):
+def trace_computational_graph(root, max_depth=None, max_nodes=None):
     """
     Trace the computational graph starting from the root node.
     
+    The graph is walked breadth-first with an explicit queue, so deep graphs
+    do not hit the recursion limit.
+    
     Args:
         root: The root Value node to start tracing from
+        max_depth: Optional maximum distance from the root to include
+        max_nodes: Optional maximum number of nodes to include
         
     Returns:
         tuple: (nodes, edges) sets containing all nodes and edges in the graph
     """
-    nodes, edges = set(), set()
-    
-    def build(v):
-        if v not in nodes:
-            nodes.add(v)
-            for child in v.children:
-                edges.add((child, v))
-                build(child)
-    
-    build(root)
+    nodes, edges = {root}, set()
+    queue = deque([(root, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for child in node.children:
+            if child not in nodes:
+                if max_nodes is not None and len(nodes) >= max_nodes:
+                    continue
+                nodes.add(child)
+                queue.append((child, depth + 1))
+            edges.add((child, node))
     return nodes, edges
 
 
-def draw_computational_graph(root, format='svg', rankdir='LR', filename=None):
+def draw_computational_graph(root, format='svg', rankdir='LR', filename=None,
+                             max_depth=None, max_nodes=None):
     """
     Create a visual representation of the computational graph.
     
+    This draws every node individually and is meant for small graphs; for
+    model-sized graphs use write_summary_dot.
+    
     Args:
         root: The root Value node to visualize
         format: Output format ('svg', 'png', 'pdf', etc.)
         rankdir: Graph direction ('LR' for left-to-right, 'TB' for top-to-bottom)
         filename: Optional filename to save the graph (without extension)
+        max_depth: Optional maximum distance from the root to draw
+        max_nodes: Optional maximum number of nodes to draw
         
     Returns:
         Digraph: The graphviz Digraph object
@@ -50,7 +67,7 @@ def draw_computational_graph(root, format='svg', rankdir='LR', filename=None):
     """
     assert rankdir in ['LR', 'TB'], "rankdir must be 'LR' or 'TB'"
     
-    nodes, edges = trace_computational_graph(root)
+    nodes, edges = trace_computational_graph(root, max_depth=max_depth, max_nodes=max_nodes)
     dot = Digraph(format=format, graph_attr={'rankdir': rankdir})
     
     # Add nodes to the graph
@@ -84,5 +101,147 @@ def draw_computational_graph(root, format='svg', rankdir='LR', filename=None):
     return dot
 
 
+def write_summary_dot(root, path, model=None, granularity='layer', rankdir='LR',
+                      max_depth=None, max_nodes=None):
+    """
+    Write a summarized DOT graph of a (possibly very large) computational graph.
+    
+    Unlike draw_computational_graph, no Digraph is built in memory: DOT lines
+    are streamed to the file while the graph is traversed. If a model is given,
+    the parameters of each layer (or neuron), their fused linear nodes and
+    activations are collapsed into a single node labelled with aggregated
+    gradient statistics (min/max/mean/L2 norm). Render the file with e.g.
+    `dot -Tsvg graph.dot -o graph.svg`.
+    
+    Args:
+        root: The root Value node (e.g. the loss)
+        path: Destination .dot file path
+        model: Optional MLP whose layers/neurons should be collapsed
+        granularity: 'layer' or 'neuron' - what a collapsed node stands for
+        rankdir: Graph direction ('LR' for left-to-right, 'TB' for top-to-bottom)
+        max_depth: Optional maximum distance from the root to include
+        max_nodes: Optional maximum number of individual nodes to write
+                   (collapsed nodes are always written)
+        
+    Returns:
+        int: Number of nodes written
+        
+    Raises:
+        AssertionError: If rankdir or granularity is invalid
+    """
+    assert rankdir in ['LR', 'TB'], "rankdir must be 'LR' or 'TB'"
+    assert granularity in ['layer', 'neuron'], "granularity must be 'layer' or 'neuron'"
+    
+    groups, group_parameters = _parameter_groups(model, granularity) if model else ({}, {})
+    
+    def unit(node):
+        """Name of the DOT node that represents node."""
+        group = _group_of(node, groups)
+        return group if group is not None else str(id(node))
+    
+    with open(path, 'w') as f:
+        f.write('digraph {\n')
+        f.write(f'  graph [rankdir={rankdir}];\n')
+        
+        # Collapsed nodes, labelled with the gradient statistics of their parameters
+        for group, (title, params) in group_parameters.items():
+            stats = _gradient_stats(params)
+            f.write(
+                f'  "{group}" [shape=record, style=bold, label="{{ {title} | {len(params)} params | '
+                f'grad min {stats["min"]:.4g} max {stats["max"]:.4g} | '
+                f'grad mean {stats["mean"]:.4g} norm {stats["norm"]:.4g} }}"];\n'
+            )
+        written = set(group_parameters)
+        
+        def write_node(node, depth):
+            """Write node's DOT line unless already written; False if over max_nodes."""
+            name = unit(node)
+            if name in written:
+                return True
+            if max_nodes is not None and len(written) - len(group_parameters) >= max_nodes:
+                return False
+            written.add(name)
+            operation = f"{node.operation} | " if node.operation else ""
+            # Nodes whose children are cut off by max_depth are drawn dashed
+            truncated = max_depth is not None and depth >= max_depth and node.children
+            style = ", style=dashed" if truncated else ""
+            f.write(
+                f'  "{name}" [shape=record, label="{{ {operation}value {node.value:.4f} | '
+                f'gradient {node.gradient:.4f} }}"{style}];\n'
+            )
+            return True
+        
+        write_node(root, 0)
+        edges = set()
+        visited = {root}
+        queue = deque([(root, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            name = unit(node)
+            for child in node.children:
+                if child not in visited:
+                    if not write_node(child, depth + 1):
+                        continue
+                    visited.add(child)
+                    queue.append((child, depth + 1))
+                child_name = unit(child)
+                if child_name != name and (child_name, name) not in edges:
+                    edges.add((child_name, name))
+                    f.write(f'  "{child_name}" -> "{name}";\n')
+        f.write('}\n')
+    return len(written)
+
+
+def _parameter_groups(model, granularity):
+    """
+    Map every parameter of a model to the collapsed node it belongs to.
+    
+    Returns:
+        tuple: (dict Value -> group name,
+                dict group name -> (title, List[Value] parameters))
+    """
+    groups, group_parameters = {}, {}
+    for i, layer in enumerate(model.layers):
+        for j, neuron in enumerate(layer.neurons):
+            if granularity == 'layer':
+                group, title = f"layer{i}", f"Layer {i} ({len(layer.neurons)} neurons)"
+            else:
+                group, title = f"layer{i}_neuron{j}", f"Layer {i} neuron {j}"
+            params = neuron.parameters()
+            group_parameters.setdefault(group, (title, []))[1].extend(params)
+            for param in params:
+                groups[param] = group
+    return groups, group_parameters
+
+
+def _group_of(node, groups):
+    """
+    Return the collapsed node a graph node belongs to, or None.
+    
+    Parameters belong to their neuron's group, as do the neuron's fused
+    linear node (whose first child is the bias) and an activation applied
+    directly to it.
+    """
+    group = groups.get(node)
+    if group is None and node.operation in ('tanh', 'relu'):
+        node = node.children[0]
+    if group is None and node.operation == 'linear':
+        group = groups.get(node.children[0])
+    return group
+
+
+def _gradient_stats(params):
+    """Min, max, mean and L2 norm of the gradients of the given parameters."""
+    gradients = [p.gradient for p in params]
+    return {
+        "min": min(gradients),
+        "max": max(gradients),
+        "mean": sum(gradients) / len(gradients),
+        "norm": math.sqrt(sum(g * g for g in gradients)),
+    }
+
+
 # Backward compatibility alias
 draw_dot = draw_computational_graph